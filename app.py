@@ -1,46 +1,98 @@
+import os
 import pygame
 import sys
 from kinect_manager import KinectManager
+from blur_effect import BlurEffect
+from text_cache import text_cache, DEFAULT_TEXT_CACHE_SIZE
+from frame_scheduler import FrameScheduler
 from gui.main_menu import MainMenu
 from gui.exercise_menu import ExerciseMenu
 from gui.exercise_runner import ExerciseRunner
 from heartrate.heart_rate_monitor import HeartRateMonitor
 from leaderboard.leaderboard_render import LeaderboardRender
+from leaderboard.leaderboard_manager import LeaderboardManager
+
+EXERCISE_TYPES = ["squats", "pushups", "jumping_jacks", "bicep_curls", "arm_raises", "free_mode"]
 
 class KinectApp:
-    def __init__(self, config):
+    def __init__(self, config, kinect_manager=None):
+        window_cfg = config.get("window", {})
+        if window_cfg.get("headless", False):
+            # No window: SDL renders into memory, e.g. for benchmarks and CI
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         pygame.init()
         self.config = config
-        self.kinect_manager = KinectManager()
-        window_cfg = config.get("window", {})
-        self.screen = pygame.display.set_mode(
+        if kinect_manager is None:
+            kinect_manager = KinectManager(config)
+        self.kinect_manager = kinect_manager
+        self.display = pygame.display.set_mode(
             (window_cfg.get("width", 1920), window_cfg.get("height", 1080)),
             pygame.HWSURFACE | pygame.DOUBLEBUF
         )
+        # Menus draw in window space; only the camera layer and joint
+        # positions are scaled up from the preview resolution.
+        self.screen = self.display
         pygame.display.set_caption(window_cfg.get("title", "Kinect App"))
-        timing_cfg = config.get("timing", {})
-        self.fps = timing_cfg.get("fps", 30)
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(config)
+        rendering_cfg = config.get("rendering", {})
+        # Layered menus redraw only what changed and push just those areas to the display
+        self.layered = rendering_cfg.get("layered", True)
+        text_cache.resize(rendering_cfg.get("text_cache_size", DEFAULT_TEXT_CACHE_SIZE))
         self.current_menu = None
         self.menu_stack = []
+        # Menus are built once and reused; on_enter/on_exit reset per-visit state
+        self.leaderboard = LeaderboardManager()
+        self.blur_effect = BlurEffect(config)
+        self.menus = {}
+        if config.get("menus", {}).get("preload", True):
+            self.preload_menus()
         self.switch_to_menu("main")
 
-    def switch_to_menu(self, menu_type, **kwargs):
+    def create_menu(self, menu_type, exercise_type=None):
         if menu_type == "main":
-            self.current_menu = MainMenu(self.kinect_manager, self.config)
+            return MainMenu(self.kinect_manager, self.config, blur_effect=self.blur_effect)
         elif menu_type == "exercise_select":
-            self.current_menu = ExerciseMenu(self.kinect_manager, self.config)
+            return ExerciseMenu(self.kinect_manager, self.config, blur_effect=self.blur_effect)
         elif menu_type == "exercise_run":
-            exercise_type = kwargs.get("exercise_type", "free_mode")
-            self.current_menu = ExerciseRunner(self.kinect_manager, self.config, exercise_type)
+            return ExerciseRunner(self.kinect_manager, self.config, exercise_type, leaderboard=self.leaderboard,
+                                  blur_effect=self.blur_effect)
         elif menu_type == "heart_rate":
-            self.current_menu = HeartRateMonitor(self.kinect_manager, self.config)
+            return HeartRateMonitor(self.kinect_manager, self.config, blur_effect=self.blur_effect)
         elif menu_type == "leaderboard":
-            self.current_menu = LeaderboardRender(self.kinect_manager, self.config)
-        else:
+            return LeaderboardRender(self.kinect_manager, self.config, leaderboard=self.leaderboard,
+                                     blur_effect=self.blur_effect)
+        return None
+
+    def get_menu(self, menu_type, exercise_type=None):
+        key = (menu_type, exercise_type)
+        menu = self.menus.get(key)
+        if menu is None:
+            menu = self.create_menu(menu_type, exercise_type)
+            if menu is not None:
+                self.menus[key] = menu
+        return menu
+
+    def preload_menus(self):
+        for menu_type in ["main", "exercise_select", "heart_rate", "leaderboard"]:
+            self.get_menu(menu_type)
+        for exercise_type in EXERCISE_TYPES:
+            self.get_menu("exercise_run", exercise_type)
+
+    def switch_to_menu(self, menu_type, **kwargs):
+        exercise_type = None
+        if menu_type == "exercise_run":
+            exercise_type = kwargs.get("exercise_type", "free_mode")
+        menu = self.get_menu(menu_type, exercise_type)
+        if menu is None:
             print("Unknown menu type: {}".format(menu_type))
             return
         
+        if self.current_menu is not None:
+            self.current_menu.on_exit()
+        self.current_menu = menu
+        self.current_menu.on_enter()
+        
         # Update menu stack for navigation
         if menu_type != "main" and len(self.menu_stack) == 0:
             self.menu_stack.append(menu_type)
@@ -64,30 +116,54 @@ class KinectApp:
             self.switch_to_menu("heart_rate")
         elif action == "back":
             self.go_back()
-        elif action in ["squats", "pushups", "jumping_jacks", "bicep_curls", "arm_raises", "free_mode"]:
+        elif action in EXERCISE_TYPES:
             self.switch_to_menu("exercise_run", exercise_type=action)
         elif action == "leaderboard":
             self.switch_to_menu("leaderboard")
         return True
 
-    def run(self):
+    def present(self, dirty_rects=None):
+        if dirty_rects is None:
+            pygame.display.update()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    def step(self):
+        """Run one main loop iteration. Returns False once the app should quit."""
         running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-            
-            if self.current_menu:
-                action = self.current_menu.update(self.screen)
-                if action:
-                    running = self.handle_menu_action(action)
-            
-            if self.current_menu:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.scheduler.request_redraw()
+
+        snapshot = self.kinect_manager.poll()
+
+        if self.current_menu and self.scheduler.should_update(self.current_menu, snapshot):
+            action = self.current_menu.update(self.screen)
+            if action:
+                running = self.handle_menu_action(action) and running
+        
+        if self.current_menu and self.scheduler.should_draw(self.current_menu, snapshot):
+            dirty_rects = None
+            if self.layered:
+                dirty_rects = self.current_menu.draw_layered(self.screen)
+            else:
                 self.current_menu.draw(self.screen)
-            
-            pygame.display.update()
-            self.clock.tick(self.fps)
+            self.present(dirty_rects)
         
+        self.scheduler.wait()
+        return running
+
+    def close(self):
+        for menu in self.menus.values():
+            menu.close()
         self.kinect_manager.close()
+
+    def run(self):
+        while self.step():
+            pass
+        
+        self.close()
         pygame.quit()
         sys.exit()
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""Headless frame-time benchmark for every menu, next to main.py.
+
+The benchmark itself lives in benchmarks/menus.py; see there for options.
+"""
+import sys
+
+from benchmarks.menus import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Micro-benchmark for converting a Kinect color frame into a pygame Surface.
+
+Run from the repository root:
+
+    python -m benchmarks.color_frame --frames 200
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from color_frame import ColorFrameConverter, convert_color_frame_legacy
+
+def time_per_frame(convert, frames, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        convert(frames[i % len(frames)])
+    return (time.perf_counter() - start) / iterations * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Color frame conversion benchmark")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    pygame.init()
+    rng = np.random.RandomState(0)
+    frames = [rng.randint(0, 256, args.width * args.height * 4).astype(np.uint8) for _ in range(4)]
+
+    converter = ColorFrameConverter(args.width, args.height)
+    legacy_ms = time_per_frame(lambda f: convert_color_frame_legacy(f, args.width, args.height), frames, args.frames)
+    converter_ms = time_per_frame(converter.convert, frames, args.frames)
+
+    print("Resolution: {}x{}, {} frames".format(args.width, args.height, args.frames))
+    print("make_surface (before): {:.2f} ms/frame".format(legacy_ms))
+    print("ColorFrameConverter (after): {:.2f} ms/frame".format(converter_ms))
+    print("Speed-up: {:.1f}x".format(legacy_ms / converter_ms))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
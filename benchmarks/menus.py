@@ -0,0 +1,278 @@
+"""Headless frame-time benchmark for every menu.
+
+Drives each screen with a scripted person (a squatting skeleton whose right
+hand sweeps across the buttons) for a fixed number of frames, without a
+window, and prints frame time percentiles and Python allocations per menu as
+JSON. Run from the repository root:
+
+    python benchmark.py --frames 300
+    python -m benchmarks.menus --recording recordings/squats --output bench.json
+
+Allocations are measured with tracemalloc in a second pass, so they do not
+skew the timings: alloc_peak_kib is the largest amount of memory held above
+the steady state while drawing, alloc_growth_kib what was still held after
+the last frame. They cover Python and numpy memory, not SDL surface pixels.
+
+Frames go through the app's FrameScheduler: with --render-mode on_demand,
+frames_drawn and frames_skipped show how many redraws each menu avoided.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+
+from kinect_compat import PyKinectV2
+from color_frame import KINECT_COLOR_SIZE
+from replay import KinectRecording, ReplayKinectManager
+from text_cache import text_cache
+
+BODY_FPS = 30.0
+SQUAT_PERIOD = 3.0
+
+# Standing pose in camera space (meters, x right, y up), feet on the floor
+# 2.5 m in front of the sensor.
+STANDING_POSE = {
+    PyKinectV2.JointType_SpineBase: (0.0, -0.10),
+    PyKinectV2.JointType_SpineMid: (0.0, 0.15),
+    PyKinectV2.JointType_Neck: (0.0, 0.45),
+    PyKinectV2.JointType_Head: (0.0, 0.60),
+    PyKinectV2.JointType_ShoulderLeft: (-0.18, 0.38),
+    PyKinectV2.JointType_ElbowLeft: (-0.25, 0.12),
+    PyKinectV2.JointType_WristLeft: (-0.27, -0.10),
+    PyKinectV2.JointType_HandLeft: (-0.28, -0.18),
+    PyKinectV2.JointType_ShoulderRight: (0.18, 0.38),
+    PyKinectV2.JointType_ElbowRight: (0.25, 0.12),
+    PyKinectV2.JointType_WristRight: (0.27, -0.10),
+    PyKinectV2.JointType_HandRight: (0.28, -0.18),
+    PyKinectV2.JointType_HipLeft: (-0.10, -0.12),
+    PyKinectV2.JointType_KneeLeft: (-0.11, -0.55),
+    PyKinectV2.JointType_AnkleLeft: (-0.12, -0.95),
+    PyKinectV2.JointType_FootLeft: (-0.12, -1.00),
+    PyKinectV2.JointType_HipRight: (0.10, -0.12),
+    PyKinectV2.JointType_KneeRight: (0.11, -0.55),
+    PyKinectV2.JointType_AnkleRight: (0.12, -0.95),
+    PyKinectV2.JointType_FootRight: (0.12, -1.00),
+    PyKinectV2.JointType_SpineShoulder: (0.0, 0.40),
+    PyKinectV2.JointType_HandTipLeft: (-0.29, -0.24),
+    PyKinectV2.JointType_ThumbLeft: (-0.25, -0.20),
+    PyKinectV2.JointType_HandTipRight: (0.29, -0.24),
+    PyKinectV2.JointType_ThumbRight: (0.25, -0.20),
+}
+BODY_DEPTH = 2.5
+# Joints that stay put while squatting
+PLANTED_JOINTS = [PyKinectV2.JointType_AnkleLeft, PyKinectV2.JointType_FootLeft,
+                  PyKinectV2.JointType_AnkleRight, PyKinectV2.JointType_FootRight]
+KNEES = [PyKinectV2.JointType_KneeLeft, PyKinectV2.JointType_KneeRight]
+
+# Approximate Kinect v2 color camera intrinsics
+COLOR_FOCAL_LENGTH = 1060.0
+
+MENUS = [
+    ("main", None),
+    ("exercise_select", None),
+    ("exercise_run", "squats"),
+    ("exercise_run", "jumping_jacks"),
+    ("exercise_run", "bicep_curls"),
+    ("exercise_run", "arm_raises"),
+    ("exercise_run", "free_mode"),
+    ("heart_rate", None),
+    ("leaderboard", None),
+]
+
+def project_to_color(points):
+    """Pinhole projection of (..., 3) camera-space points to native color pixels."""
+    center_x, center_y = KINECT_COLOR_SIZE[0] / 2.0, KINECT_COLOR_SIZE[1] / 2.0
+    u = center_x + COLOR_FOCAL_LENGTH * points[..., 0] / points[..., 2]
+    v = center_y - COLOR_FOCAL_LENGTH * points[..., 1] / points[..., 2]
+    return np.stack([u, v], axis=-1).astype(np.float32)
+
+def make_synthetic_recording(duration, color_frame_count=8, max_body_count=6, seed=0):
+    """In-memory KinectRecording of one person squatting, with the right hand sweeping the screen."""
+    body_count = int(duration * BODY_FPS)
+    timestamps = np.arange(body_count) / BODY_FPS
+    joint_count = PyKinectV2.JointType_Count
+
+    standing = np.zeros((joint_count, 3), dtype=np.float32)
+    for joint, (x, y) in STANDING_POSE.items():
+        standing[joint] = (x, y, BODY_DEPTH)
+
+    depth = (1 - np.cos(2 * np.pi * timestamps / SQUAT_PERIOD)) / 2  # 0 standing .. 1 squatting
+    poses = np.repeat(standing[None], body_count, axis=0)
+    moving = np.ones(joint_count, dtype=bool)
+    moving[PLANTED_JOINTS] = False
+    poses[:, moving, 1] -= 0.35 * depth[:, None]
+    poses[:, KNEES, 2] -= 0.25 * depth[:, None]
+
+    joints = np.zeros((body_count, max_body_count, joint_count, 4), dtype=np.float32)
+    joints[:, 0, :, :3] = poses
+    joints[:, 0, :, 3] = PyKinectV2.TrackingState_Tracked
+
+    color_points = np.full((body_count, max_body_count, joint_count, 2), np.inf, dtype=np.float32)
+    color_points[:, 0] = project_to_color(poses)
+    # The hand cursor follows a Lissajous path over the whole screen so every
+    # menu sees hovers, holds and scroll gestures.
+    phase = 2 * np.pi * timestamps
+    color_points[:, 0, PyKinectV2.JointType_HandRight, 0] = KINECT_COLOR_SIZE[0] * (0.5 + 0.45 * np.sin(phase / 7.0))
+    color_points[:, 0, PyKinectV2.JointType_HandRight, 1] = KINECT_COLOR_SIZE[1] * (0.5 + 0.45 * np.sin(phase / 5.0))
+
+    tracked = np.zeros((body_count, max_body_count), dtype=bool)
+    tracked[:, 0] = True
+    tracking_ids = np.zeros((body_count, max_body_count), dtype=np.uint64)
+    tracking_ids[:, 0] = 1
+
+    # A few distinct noisy frames, repeated, stand in for the camera
+    rng = np.random.RandomState(seed)
+    width, height = KINECT_COLOR_SIZE
+    base = np.zeros((height, width, 4), dtype=np.uint8)
+    base[..., 0] = np.linspace(40, 200, width, dtype=np.uint8)[None, :]
+    base[..., 1] = np.linspace(60, 160, height, dtype=np.uint8)[:, None]
+    base[..., 2] = 90
+    color_frames = np.repeat(base[None], color_frame_count, axis=0)
+    color_frames[..., :3] += rng.randint(0, 16, color_frames[..., :3].shape).astype(np.uint8)
+    chunks = [color_frames] * int(math.ceil(body_count / float(color_frame_count)))
+
+    return KinectRecording(timestamps, joints, color_points, tracked, tracking_ids,
+                           color_timestamps=timestamps, color_chunks=chunks,
+                           color_chunk_size=color_frame_count, color_size=KINECT_COLOR_SIZE)
+
+def benchmark_config(config, render_mode="continuous"):
+    config = json.loads(json.dumps(config))
+    config.setdefault("window", {})["headless"] = True
+    config.setdefault("capture", {})["threaded"] = False
+    timing_cfg = config.setdefault("timing", {})
+    # continuous draws every frame; never let a hover turn into a click
+    timing_cfg["render_mode"] = render_mode
+    timing_cfg["hold_time"] = 1e9
+    config.setdefault("menus", {})["preload"] = True
+    return config
+
+def run_frame(app, menu):
+    snapshot = app.kinect_manager.poll()
+    if app.scheduler.should_update(menu, snapshot):
+        menu.update(app.screen)
+    if not app.scheduler.should_draw(menu, snapshot):
+        return
+    dirty_rects = None
+    if app.layered:
+        dirty_rects = menu.draw_layered(app.screen)
+    else:
+        menu.draw(app.screen)
+    app.present(dirty_rects)
+
+def enter_menu(app, menu_type, exercise_type):
+    app.switch_to_menu(menu_type, exercise_type=exercise_type)
+    menu = app.current_menu
+    if menu_type == "heart_rate":
+        menu.start_measurement()
+    return menu
+
+def benchmark_menu(app, menu_type, exercise_type, frames, warmup, allocations):
+    menu = enter_menu(app, menu_type, exercise_type)
+    for _ in range(warmup):
+        run_frame(app, menu)
+
+    scheduler = app.scheduler
+    drawn, skipped = scheduler.frames_drawn, scheduler.frames_skipped
+    frame_times = np.empty(frames)
+    for i in range(frames):
+        start = time.perf_counter()
+        run_frame(app, menu)
+        frame_times[i] = time.perf_counter() - start
+    frame_ms = frame_times * 1000.0
+
+    result = {
+        "frames": frames,
+        "mean_ms": round(float(frame_ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(frame_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(frame_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(frame_ms, 99)), 3),
+        "max_ms": round(float(frame_ms.max()), 3),
+        "frames_drawn": scheduler.frames_drawn - drawn,
+        "frames_skipped": scheduler.frames_skipped - skipped,
+    }
+
+    if allocations:
+        # Trace from before the warmup so buffers that are recycled every
+        # frame (capture ring buffers, cached surfaces) are part of the
+        # baseline, and only per-frame working memory and growth remain.
+        tracemalloc.start()
+        menu = enter_menu(app, menu_type, exercise_type)
+        for _ in range(warmup):
+            run_frame(app, menu)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(frames):
+            run_frame(app, menu)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["alloc_peak_kib"] = round((peak - baseline) / 1024.0, 1)
+        result["alloc_growth_kib"] = round((current - baseline) / 1024.0, 1)
+    return result
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark for every menu")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per menu")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames after entering a menu")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--recording", metavar="DIR", help="replay this recording instead of the synthetic person")
+    parser.add_argument("--menus", nargs="+", metavar="MENU",
+                        help="only these menus, e.g. main exercise_run:squats heart_rate")
+    parser.add_argument("--render-mode", choices=["continuous", "on_demand"], default="continuous",
+                        help="frame scheduling to measure; on_demand skips redraws the menu does not need")
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report here instead of stdout")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    with open(args.config, "r") as f:
+        config = benchmark_config(json.load(f), args.render_mode)
+
+    if args.recording:
+        recording = KinectRecording.load(args.recording)
+    else:
+        frames_needed = len(MENUS) * (args.frames + args.warmup) * 2
+        recording = make_synthetic_recording(min(frames_needed / BODY_FPS, 120.0))
+    kinect_manager = ReplayKinectManager(recording, config, realtime=False, loop=True)
+
+    from app import KinectApp
+    app = KinectApp(config, kinect_manager)
+
+    menus = MENUS
+    if args.menus:
+        menus = [tuple(name.split(":", 1)) if ":" in name else (name, None) for name in args.menus]
+
+    report = {
+        "frames": args.frames,
+        "preview_size": [kinect_manager.preview_width, kinect_manager.preview_height],
+        "layered": app.layered,
+        "render_mode": app.scheduler.mode,
+        "recording": args.recording or "synthetic",
+        "menus": {},
+    }
+    for menu_type, exercise_type in menus:
+        name = menu_type if exercise_type is None else "{}:{}".format(menu_type, exercise_type)
+        report["menus"][name] = benchmark_menu(app, menu_type, exercise_type, args.frames, args.warmup,
+                                               not args.no_allocations)
+    report["text_cache"] = text_cache.stats()
+
+    app.close()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,175 @@
+import time
 import pygame
-from PIL import Image, ImageFilter
+import cv2
 import numpy as np
+from color_frame import preview_scale_from_config, surface_pixels
+
+# Gaussian sigma, in downsampled pixels, each quality level blurs at. The
+# frame is shrunk so that the configured radius maps onto this sigma; a
+# larger value keeps more pixels and costs more.
+BLUR_QUALITY_SIGMA = {
+    "fast": 2.0,
+    "balanced": 4.0,
+    "high": 8.0,
+}
+
+BLUR_MODES = ("full", "face")
 
 class BlurEffect:
+    """Privacy blur for the camera feed.
+
+    The frame is downsampled, blurred at low resolution and scaled back up,
+    which looks like a full-resolution Gaussian blur of the same radius at a
+    fraction of the cost. All intermediate buffers and the output surface are
+    reused between frames, so the returned surface is only valid until the
+    next call.
+
+    In "face" mode only a padded box around each tracked head is blurred. The
+    boxes are smoothed between frames and kept for face_hold_time after a head
+    is lost; a tracked person whose head cannot be placed gets the whole frame
+    blurred instead.
+    """
+
     def __init__(self, config):
         visual_effects_cfg = config.get("visual_effects", {})
         self.enabled = visual_effects_cfg.get("blur_enabled", False)
-        self.radius = visual_effects_cfg.get("blur_radius", 15)
-        
-    def apply_blur(self, surface):
-        """Apply blur effect to camera feed for privacy"""
+        # blur_radius is given in native camera pixels, scale it so the blur
+        # looks the same at any preview resolution
+        self.pixel_scale = preview_scale_from_config(config)[0]
+        self.radius = visual_effects_cfg.get("blur_radius", 15) * self.pixel_scale
+        self.quality = visual_effects_cfg.get("blur_quality", "balanced")
+        if self.quality not in BLUR_QUALITY_SIGMA:
+            print("Unknown blur quality: {}, using balanced".format(self.quality))
+            self.quality = "balanced"
+
+        self.mode = visual_effects_cfg.get("blur_mode", "full")
+        if self.mode not in BLUR_MODES:
+            print("Unknown blur mode: {}, using full".format(self.mode))
+            self.mode = "full"
+        # Box half size is face_padding times the head to neck distance;
+        # face_size (native pixels) is used when the neck is not visible.
+        self.face_padding = visual_effects_cfg.get("face_padding", 1.6)
+        self.face_size = visual_effects_cfg.get("face_size", 220) * self.pixel_scale
+        self.face_smoothing = visual_effects_cfg.get("face_smoothing", 0.5)
+        self.face_hold_time = visual_effects_cfg.get("face_hold_time", 0.5)
+        # tracking id -> [center x, center y, half size, last seen]
+        self._face_boxes = {}
+
+        self._output = None
+        self._small = None
+        self._small_blurred = None
+
+    def get_downsample_factor(self):
+        return max(1.0, self.radius / BLUR_QUALITY_SIGMA[self.quality])
+
+    def _prepare_buffers(self, surface):
+        width, height = surface.get_size()
+        factor = self.get_downsample_factor()
+        small_size = (max(1, int(round(width / factor))), max(1, int(round(height / factor))))
+        if self._output is None or self._output.get_size() != (width, height) \
+                or self._output.get_masks() != surface.get_masks():
+            self._output = pygame.Surface((width, height), 0, surface)
+        if self._small is None or self._small.shape[:2] != (small_size[1], small_size[0]):
+            self._small = np.empty((small_size[1], small_size[0], 4), dtype=np.uint8)
+            self._small_blurred = np.empty_like(self._small)
+
+    @property
+    def face_mode(self):
+        return self.mode == "face"
+
+    def _blur_into(self, source, output):
+        """Downsample, blur and upsample source (height, width, 4) into output of the same shape.
+
+        source may be the whole frame or a box inside it; the low-resolution
+        working images are views into the frame-sized buffers.
+        """
+        height, width = source.shape[:2]
+        factor = self.get_downsample_factor()
+        small_width = min(self._small.shape[1], max(1, int(round(width / factor))))
+        small_height = min(self._small.shape[0], max(1, int(round(height / factor))))
+        small = self._small[:small_height, :small_width]
+        small_blurred = self._small_blurred[:small_height, :small_width]
+        sigma = self.radius * small_width / float(width)
+        cv2.resize(source, (small_width, small_height), dst=small, interpolation=cv2.INTER_AREA)
+        cv2.GaussianBlur(small, (0, 0), sigma, dst=small_blurred)
+        cv2.resize(small_blurred, (width, height), dst=output, interpolation=cv2.INTER_LINEAR)
+
+    def update_face_boxes(self, heads, now=None):
+        """Track one blur box per person.
+
+        heads maps tracking id to (head, neck) pixel positions (NaN when not
+        visible). Returns the boxes as (x0, y0, x1, y1), or None when a
+        tracked head could not be placed and the whole frame has to be blurred.
+        """
+        if now is None:
+            now = time.monotonic()
+        lost = False
+        for tracking_id, (head, neck) in heads.items():
+            box = self._face_boxes.get(tracking_id)
+            if np.isnan(head).any():
+                if box is None or now - box[3] > self.face_hold_time:
+                    lost = True
+                continue
+            if np.isnan(neck).any():
+                half = self.face_size / 2.0
+            else:
+                half = float(np.hypot(*(head - neck))) * self.face_padding
+            if box is None:
+                self._face_boxes[tracking_id] = [float(head[0]), float(head[1]), half, now]
+                continue
+            keep = self.face_smoothing
+            center_x = keep * box[0] + (1 - keep) * float(head[0])
+            center_y = keep * box[1] + (1 - keep) * float(head[1])
+            # Grow the smoothed box so it always covers the measured one
+            lag = float(max(abs(center_x - head[0]), abs(center_y - head[1])))
+            self._face_boxes[tracking_id] = [center_x, center_y, max(keep * box[2] + (1 - keep) * half, half + lag), now]
+
+        for tracking_id in list(self._face_boxes):
+            if now - self._face_boxes[tracking_id][3] > self.face_hold_time:
+                del self._face_boxes[tracking_id]
+        if lost:
+            return None
+        return [(int(x - half), int(y - half), int(np.ceil(x + half)), int(np.ceil(y + half)))
+                for x, y, half, _ in self._face_boxes.values()]
+
+    def _blur_faces(self, surface, boxes):
+        width, height = surface.get_size()
+        self._output.blit(surface, (0, 0))
+        source = surface_pixels(surface)
+        output = surface_pixels(self._output)
+        for x0, y0, x1, y1 in boxes:
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, width), min(y1, height)
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            self._blur_into(source[y0:y1, x0:x1], output[y0:y1, x0:x1])
+        del source, output
+
+    def apply_blur(self, surface, heads=None):
+        """Apply blur effect to camera feed for privacy.
+
+        In face mode heads is the mapping described in update_face_boxes().
+        """
         if not self.enabled:
             return surface
         
         try:
+            self._prepare_buffers(surface)
+            if surface.get_bytesize() != 4:
+                raise ValueError("blur needs a 32-bit surface, got {}-bit".format(surface.get_bitsize()))
 
-            width, height = surface.get_size()
-
-            raw_data = pygame.image.tostring(surface, 'RGB')
-
-            pil_image = Image.frombytes('RGB', (width, height), raw_data)
-            
-            blurred_image = pil_image.filter(ImageFilter.GaussianBlur(radius=self.radius))
-            
+            if self.face_mode:
+                boxes = self.update_face_boxes(heads or {})
+                if boxes is not None:
+                    self._blur_faces(surface, boxes)
+                    return self._output
 
-            raw_blurred = blurred_image.tobytes()
-            blurred_surface = pygame.image.fromstring(raw_blurred, (width, height), 'RGB')
+            source = surface_pixels(surface)
+            output = surface_pixels(self._output)
+            self._blur_into(source, output)
+            del source, output
             
-            return blurred_surface
+            return self._output
             
         except Exception as e:
             print("Blur effect error: {}".format(e))
@@ -35,9 +177,11 @@ class BlurEffect:
             privacy_surface.fill((50, 50, 50))  
             return privacy_surface
     
-    def update_settings(self, enabled=None, radius=None):
+    def update_settings(self, enabled=None, radius=None, quality=None):
         """Update blur settings at runtime"""
         if enabled is not None:
             self.enabled = enabled
         if radius is not None:
-            self.radius = max(5, min(50, radius))  
\ No newline at end of file
+            self.radius = max(5, min(50, radius)) * self.pixel_scale
+        if quality in BLUR_QUALITY_SIGMA:
+            self.quality = quality
@@ -1,4 +1,5 @@
 import pygame
+from font_registry import get_font
 
 class Button:
     def __init__(self, config):
@@ -25,19 +26,20 @@ class Button:
         available_width = self.rect.width - (padding * 2)
         available_height = self.rect.height - (padding * 2)
         
-        font_size = self.max_font_size
-        
-        while font_size >= self.min_font_size:
-            test_font = pygame.font.SysFont(self.font_name, font_size)
-            text_surface = test_font.render(self.text, True, self.text_color)
-            text_width, text_height = text_surface.get_size()
+        # Largest size whose text fits, measured with font.size() instead of rendering
+        low, high = self.min_font_size, self.max_font_size
+        best = self.min_font_size
+        while low <= high:
+            font_size = (low + high) // 2
+            text_width, text_height = get_font(self.font_name, font_size).size(self.text)
             
             if text_width <= available_width and text_height <= available_height:
-                return test_font, font_size
-                
-            font_size -= 1
+                best = font_size
+                low = font_size + 1
+            else:
+                high = font_size - 1
         
-        return pygame.font.SysFont(self.font_name, self.min_font_size), self.min_font_size
+        return get_font(self.font_name, best), best
 
     def update_text(self, new_text):
         self.text = new_text
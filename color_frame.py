@@ -0,0 +1,67 @@
+import pygame
+import numpy as np
+
+# Channel masks describing the Kinect's native BGRA byte order as a 32-bit
+# little-endian pixel. This is also the XRGB8888 layout Windows uses for the
+# display, so blitting the surface does not need a format conversion.
+BGRA_MASKS = (0x00FF0000, 0x0000FF00, 0x000000FF, 0)
+
+# Native resolution of the Kinect v2 color camera.
+KINECT_COLOR_SIZE = (1920, 1080)
+
+def preview_size_from_config(config):
+    """Resolution the color feed is processed and drawn at, defaulting to the window size."""
+    window_cfg = config.get("window", {})
+    capture_cfg = config.get("capture", {})
+    width = capture_cfg.get("preview_width", window_cfg.get("width", KINECT_COLOR_SIZE[0]))
+    height = capture_cfg.get("preview_height", window_cfg.get("height", KINECT_COLOR_SIZE[1]))
+    return int(width), int(height)
+
+def display_size_from_config(config):
+    """Window size the menus lay out and draw at."""
+    window_cfg = config.get("window", {})
+    return int(window_cfg.get("width", KINECT_COLOR_SIZE[0])), int(window_cfg.get("height", KINECT_COLOR_SIZE[1]))
+
+def preview_scale_from_config(config):
+    """Ratio between preview pixels and native color camera pixels."""
+    width, height = preview_size_from_config(config)
+    return width / float(KINECT_COLOR_SIZE[0]), height / float(KINECT_COLOR_SIZE[1])
+
+def surface_pixels(surface):
+    """(height, width, 4) uint8 view of a 32-bit surface's memory, in the surface's byte order.
+
+    The view locks the surface; delete it before blitting. Returns None for
+    surfaces whose memory cannot be viewed this way (other depths, padded rows).
+    """
+    if surface.get_bytesize() != 4:
+        return None
+    pixels = pygame.surfarray.pixels2d(surface).T  # (height, width) uint32
+    if not pixels.flags.c_contiguous:
+        return None
+    return pixels.view(np.uint8).reshape(pixels.shape + (4,))
+
+class ColorFrameConverter:
+    """Copies raw BGRA color frames into a single preallocated Surface.
+
+    Each frame costs one memory copy straight into the surface pixels, with no
+    intermediate arrays and no new Surface allocation. The returned surface is
+    reused for the next frame, so callers must not hold on to it across frames.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.surface = pygame.Surface((width, height), 0, 32, BGRA_MASKS)
+
+    def convert(self, frame):
+        source = np.ascontiguousarray(frame).view(np.uint32).reshape((self.height, self.width))
+        pixels = pygame.surfarray.pixels2d(self.surface)  # (width, height) view, locks the surface
+        np.copyto(pixels.T, source)
+        del pixels
+        return self.surface
+
+def convert_color_frame_legacy(frame, width, height):
+    """Original conversion: RGB slice, channel swap and a fresh surface per frame."""
+    frame = frame.reshape((height, width, 4))  # BGRA
+    frame_rgb = frame[:, :, :3][:, :, ::-1]  # to RGB
+    return pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
@@ -1,5 +1,6 @@
 from .base_exercises import BaseExercise
-from pykinect2 import PyKinectV2
+from kinect_compat import PyKinectV2
+from joint_array import Y
 
 class ArmRaisesExercise(BaseExercise):
     def __init__(self, config=None):
@@ -22,14 +23,13 @@ class ArmRaisesExercise(BaseExercise):
             PyKinectV2.JointType_HandRight
         ]
 
-    def _exercise_logic(self, joints):
-        shoulder_left = joints[PyKinectV2.JointType_ShoulderLeft]
-        shoulder_right = joints[PyKinectV2.JointType_ShoulderRight]
-        hand_left = joints[PyKinectV2.JointType_HandLeft]
-        hand_right = joints[PyKinectV2.JointType_HandRight]
+    def measure(self, joints):
+        left_height = joints[..., PyKinectV2.JointType_HandLeft, Y] - joints[..., PyKinectV2.JointType_ShoulderLeft, Y]
+        right_height = joints[..., PyKinectV2.JointType_HandRight, Y] - joints[..., PyKinectV2.JointType_ShoulderRight, Y]
+        return left_height, right_height
 
-        left_height = hand_left.Position.y - shoulder_left.Position.y
-        right_height = hand_right.Position.y - shoulder_right.Position.y
+    def _exercise_logic(self, measurements):
+        left_height, right_height = [float(value) for value in measurements]
         avg_height = (left_height + right_height) / 2
 
         self.last_left_hand_shoulder_height = left_height
@@ -1,5 +1,6 @@
-import math
-from pykinect2 import PyKinectV2
+import numpy as np
+from kinect_compat import PyKinectV2
+from joint_array import STATE, joints_tracked
 
 class BaseExercise:
     def __init__(self, config=None):
@@ -12,35 +13,21 @@ class BaseExercise:
         self.form_feedback = ""
     
     def calculate_angle(self, joint1, joint2, joint3):
-        try:
-            x1, y1 = joint1.Position.x, joint1.Position.y
-            x2, y2 = joint2.Position.x, joint2.Position.y
-            x3, y3 = joint3.Position.x, joint3.Position.y
-            v1 = (x1 - x2, y1 - y2)
-            v2 = (x3 - x2, y3 - y2)
-            dot_product = v1[0] * v2[0] + v1[1] * v2[1]
-            magnitude1 = math.sqrt(v1[0]**2 + v1[1]**2)
-            magnitude2 = math.sqrt(v2[0]**2 + v2[1]**2)
-            if magnitude1 == 0 or magnitude2 == 0:
-                return 180
-            cos_angle = max(-1, min(1, dot_product / (magnitude1 * magnitude2)))
-            angle_rad = math.acos(cos_angle)
-            angle_deg = math.degrees(angle_rad)
-            return angle_deg
-        except (AttributeError, ZeroDivisionError):
-            return 180
+        """Angle at joint2 in degrees, in the x/y plane. Accepts joint rows or stacked (..., 4) arrays."""
+        v1 = joint1[..., :2] - joint2[..., :2]
+        v2 = joint3[..., :2] - joint2[..., :2]
+        dot_product = np.sum(v1 * v2, axis=-1)
+        magnitudes = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cos_angle = np.clip(dot_product / magnitudes, -1, 1)
+        return np.where(magnitudes == 0, 180.0, np.degrees(np.arccos(cos_angle)))
     
     def calculate_distance(self, joint1, joint2):
-        try:
-            x1, y1, z1 = joint1.Position.x, joint1.Position.y, joint1.Position.z
-            x2, y2, z2 = joint2.Position.x, joint2.Position.y, joint2.Position.z
-            distance = math.sqrt((x2-x1)**2 + (y2-y1)**2 + (z2-z1)**2)
-            return distance
-        except AttributeError:
-            return 0
+        """Euclidean camera-space distance between joints. Accepts joint rows or stacked (..., 4) arrays."""
+        return np.linalg.norm(joint2[..., :3] - joint1[..., :3], axis=-1)
     
     def is_joint_tracked(self, joint):
-        return joint.TrackingState == PyKinectV2.TrackingState_Tracked
+        return joint[..., STATE] == PyKinectV2.TrackingState_Tracked
     
     def get_required_joints(self):
         return []
@@ -52,15 +39,24 @@ class BaseExercise:
         if self.calibration_frames >= self.max_calibration_frames:
             self.calibrated = True
     
-    def detect_exercise(self, joints):
-        required_joints = self.get_required_joints()
-        for joint_type in required_joints:
-            if not self.is_joint_tracked(joints[joint_type]):
-                self.form_feedback = "Make sure your whole body is visible"
-                return
-        self._exercise_logic(joints)
+    def detect_exercise(self, joints, measurements=None):
+        """Run one detection step on a single body's (JointType_Count, 4) joint array.
+
+        measurements may carry this body's precomputed measure() values, e.g.
+        from a batched call over several bodies.
+        """
+        if not joints_tracked(joints, self.get_required_joints()):
+            self.form_feedback = "Make sure your whole body is visible"
+            return
+        if measurements is None:
+            measurements = self.measure(joints)
+        self._exercise_logic(measurements)
+    
+    def measure(self, joints):
+        """Compute the exercise metrics from joint arrays, vectorized over any leading body axes."""
+        raise NotImplementedError("Subclasses must implement measurements")
     
-    def _exercise_logic(self, joints):
+    def _exercise_logic(self, measurements):
         raise NotImplementedError("Subclasses must implement exercise logic")
     
     def _update_state(self, new_state):
@@ -82,3 +78,15 @@ class BaseExercise:
             "state": self.current_state,
             "form_feedback": self.form_feedback
         }
+
+def detect_exercise_batch(detectors, joints):
+    """Step several detectors of the same exercise in one vectorized pass.
+
+    detectors[i] receives the body in joints[i]; the metrics for all bodies
+    come from a single measure() call on the stacked (bodies, JointType_Count, 4) array.
+    """
+    if not detectors:
+        return
+    measurements = detectors[0].measure(joints)
+    for i, detector in enumerate(detectors):
+        detector.detect_exercise(joints[i], [values[i] for values in measurements])
@@ -1,5 +1,5 @@
 from .base_exercises import BaseExercise
-from pykinect2 import PyKinectV2
+from kinect_compat import PyKinectV2
 
 class BicepCurlsExercise(BaseExercise):
     def __init__(self, config=None):
@@ -21,14 +21,15 @@ class BicepCurlsExercise(BaseExercise):
             PyKinectV2.JointType_HandRight
         ]
 
-    def _exercise_logic(self, joints):
-        shoulder_left = joints[PyKinectV2.JointType_ShoulderLeft]
-        shoulder_right = joints[PyKinectV2.JointType_ShoulderRight]
-        hand_left = joints[PyKinectV2.JointType_HandLeft]
-        hand_right = joints[PyKinectV2.JointType_HandRight]
+    def measure(self, joints):
+        left_distance = self.calculate_distance(joints[..., PyKinectV2.JointType_HandLeft, :],
+                                                joints[..., PyKinectV2.JointType_ShoulderLeft, :])
+        right_distance = self.calculate_distance(joints[..., PyKinectV2.JointType_HandRight, :],
+                                                 joints[..., PyKinectV2.JointType_ShoulderRight, :])
+        return left_distance, right_distance
 
-        left_distance = self.calculate_distance(hand_left, shoulder_left)
-        right_distance = self.calculate_distance(hand_right, shoulder_right)
+    def _exercise_logic(self, measurements):
+        left_distance, right_distance = [float(value) for value in measurements]
         avg_distance = (left_distance + right_distance) / 2
 
         self.last_left_hand_shoulder_distance = left_distance
@@ -1,5 +1,7 @@
 from .base_exercises import BaseExercise
-from pykinect2 import PyKinectV2
+import numpy as np
+from kinect_compat import PyKinectV2
+from joint_array import X, Y
 
 class JumpingJacksExercise(BaseExercise):
     def __init__(self, config=None):
@@ -22,18 +24,16 @@ class JumpingJacksExercise(BaseExercise):
             PyKinectV2.JointType_FootRight
         ]
 
-    def _exercise_logic(self, joints):
-        hand_left = joints[PyKinectV2.JointType_HandLeft]
-        hand_right = joints[PyKinectV2.JointType_HandRight]
-        foot_left = joints[PyKinectV2.JointType_FootLeft]
-        foot_right = joints[PyKinectV2.JointType_FootRight]
-        head = joints[PyKinectV2.JointType_Head]
-
-        left_hand_height = head.Position.y - hand_left.Position.y
-        right_hand_height = head.Position.y - hand_right.Position.y
+    def measure(self, joints):
+        head_y = joints[..., PyKinectV2.JointType_Head, Y]
+        left_hand_height = head_y - joints[..., PyKinectV2.JointType_HandLeft, Y]
+        right_hand_height = head_y - joints[..., PyKinectV2.JointType_HandRight, Y]
         avg_hand_height = (left_hand_height + right_hand_height) / 2
+        foot_distance = np.abs(joints[..., PyKinectV2.JointType_FootLeft, X] - joints[..., PyKinectV2.JointType_FootRight, X])
+        return avg_hand_height, foot_distance
 
-        foot_distance = abs(foot_left.Position.x - foot_right.Position.x)
+    def _exercise_logic(self, measurements):
+        avg_hand_height, foot_distance = [float(value) for value in measurements]
 
         self.last_hand_head_distance = avg_hand_height
         self.last_foot_distance = foot_distance
@@ -1,5 +1,7 @@
 from .base_exercises import BaseExercise
-from pykinect2 import PyKinectV2
+import numpy as np
+from kinect_compat import PyKinectV2
+from joint_array import Y
 
 class SquatsExercise(BaseExercise):
     def __init__(self, config=None):
@@ -22,15 +24,14 @@ class SquatsExercise(BaseExercise):
             PyKinectV2.JointType_KneeRight
         ]
 
-    def _exercise_logic(self, joints):
-        hip_left = joints[PyKinectV2.JointType_HipLeft]
-        hip_right = joints[PyKinectV2.JointType_HipRight]
-        knee_left = joints[PyKinectV2.JointType_KneeLeft]
-        knee_right = joints[PyKinectV2.JointType_KneeRight]
+    def measure(self, joints):
+        hip_center_y = (joints[..., PyKinectV2.JointType_HipLeft, Y] + joints[..., PyKinectV2.JointType_HipRight, Y]) / 2
+        hip_to_left_knee = np.abs(hip_center_y - joints[..., PyKinectV2.JointType_KneeLeft, Y])
+        hip_to_right_knee = np.abs(hip_center_y - joints[..., PyKinectV2.JointType_KneeRight, Y])
+        return hip_to_left_knee, hip_to_right_knee
 
-        hip_center_y = (hip_left.Position.y + hip_right.Position.y) / 2
-        hip_to_left_knee = abs(hip_center_y - knee_left.Position.y)
-        hip_to_right_knee = abs(hip_center_y - knee_right.Position.y)
+    def _exercise_logic(self, measurements):
+        hip_to_left_knee, hip_to_right_knee = [float(value) for value in measurements]
         avg_hip_knee_distance = (hip_to_left_knee + hip_to_right_knee) / 2
 
         self.last_hip_knee_distance_left = hip_to_left_knee
@@ -0,0 +1,15 @@
+import pygame
+
+_fonts = {}
+
+def get_font(name, size):
+    """Shared pygame Font for (name, size); SysFont lookups are slow and fonts are never modified."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+def clear():
+    _fonts.clear()
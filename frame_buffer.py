@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+# A sensor frame as stored by the capture thread. seq increases by one for
+# every frame pushed, timestamp comes from time.monotonic().
+TimedFrame = namedtuple("TimedFrame", ["seq", "timestamp", "data"])
+
+class FrameRingBuffer:
+    """Small bounded buffer of the most recent frames, safe to share between threads."""
+
+    def __init__(self, capacity=4):
+        self.capacity = max(1, capacity)
+        self._frames = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._last_seq = 0
+
+    def push(self, data, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            self._last_seq += 1
+            frame = TimedFrame(self._last_seq, timestamp, data)
+            self._frames.append(frame)
+        return frame
+
+    def latest(self):
+        """Non-blocking handoff of the newest frame, or None when nothing has arrived yet."""
+        with self._lock:
+            if self._frames:
+                return self._frames[-1]
+        return None
+
+    def frames_since(self, seq):
+        """Return every buffered frame newer than seq, oldest first.
+
+        Frames that already fell out of the buffer are gone; callers can spot
+        the gap by comparing sequence numbers.
+        """
+        with self._lock:
+            return [frame for frame in self._frames if frame.seq > seq]
+
+    def last_seq(self):
+        with self._lock:
+            return self._last_seq
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
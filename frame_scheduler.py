@@ -0,0 +1,48 @@
+import pygame
+
+RENDER_MODES = ("continuous", "on_demand")
+
+class FrameScheduler:
+    """Decides, once per main loop iteration, whether the current menu updates and redraws.
+
+    "continuous" updates and redraws every iteration, capped at fps.
+    "on_demand" still polls the sensor at up to fps, but only runs menu
+    updates when a new sensor frame arrived (or a button hold is in
+    progress) and only redraws when the menu reports a visible change, so an
+    idle kiosk spends its time sleeping.
+    """
+
+    def __init__(self, config):
+        timing_cfg = config.get("timing", {})
+        self.fps = timing_cfg.get("fps", 30)
+        self.mode = timing_cfg.get("render_mode", "continuous")
+        if self.mode not in RENDER_MODES:
+            print("Unknown render mode: {}, using continuous".format(self.mode))
+            self.mode = "continuous"
+        self.clock = pygame.time.Clock()
+        self.force_redraw = True
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+
+    @property
+    def on_demand(self):
+        return self.mode == "on_demand"
+
+    def request_redraw(self):
+        """Redraw on the next iteration regardless of the menu, e.g. after the window was exposed."""
+        self.force_redraw = True
+
+    def should_update(self, menu, snapshot):
+        return not self.on_demand or menu.needs_update(snapshot)
+
+    def should_draw(self, menu, snapshot):
+        draw = not self.on_demand or self.force_redraw or menu.needs_redraw(snapshot)
+        self.force_redraw = False
+        if draw:
+            self.frames_drawn += 1
+        else:
+            self.frames_skipped += 1
+        return draw
+
+    def wait(self):
+        return self.clock.tick(self.fps)
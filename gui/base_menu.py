@@ -1,14 +1,20 @@
 import pygame
 import time
-from pykinect2 import PyKinectV2
+import numpy as np
+from kinect_compat import PyKinectV2
 from blur_effect import BlurEffect
+from text_cache import text_cache
+from font_registry import get_font
 
 class BaseMenu:
-    def __init__(self, kinect_manager, config):
+    def __init__(self, kinect_manager, config, blur_effect=None):
         self.kinect_manager = kinect_manager
         self.config = config
 
-        self.blur_effect = BlurEffect(config)
+        # KinectApp shares one blur effect, and its frame buffers, across the menu pool
+        if blur_effect is None:
+            blur_effect = BlurEffect(config)
+        self.blur_effect = blur_effect
 
         fonts_cfg = config.get("fonts", {})
         font_name = fonts_cfg.get("font_name", "Arial")
@@ -16,9 +22,10 @@ class BaseMenu:
         small_size = fonts_cfg.get("small_size", 24)
         title_size = fonts_cfg.get("title_size", 72)
 
-        self.font = pygame.font.SysFont(font_name, main_size)
-        self.small_font = pygame.font.SysFont(font_name, small_size)
-        self.title_font = pygame.font.SysFont(font_name, title_size)
+        self.font = get_font(font_name, main_size)
+        self.small_font = get_font(font_name, small_size)
+        self.title_font = get_font(font_name, title_size)
+        self.text_cache = text_cache
 
         colors_cfg = config.get("colors", {})
         self.bg_color = tuple(colors_cfg.get("background", [0, 0, 0]))
@@ -33,24 +40,42 @@ class BaseMenu:
 
         self.buttons = []
 
+        visual_effects_cfg = config.get("visual_effects", {})
+        self.camera_background = visual_effects_cfg.get("camera_background", True)
+
+        # Layered rendering state, see draw_layered()
+        self._static_layer = None
+        self._base_layer = None
+        self._needs_full_redraw = True
+        self._dirty_rects = []
+        self._previous_dirty_rects = []
+        # Hold state shown by the last draw, so ending a hover erases the indicator
+        self._drawn_holding_button = None
+
     def get_hand_position(self):
         bodies = self.kinect_manager.get_bodies()
         if bodies is None:
             return None
 
-        for i in range(self.kinect_manager.kinect.max_body_count):
-            body = bodies.bodies[i]
-            if not body.is_tracked:
-                continue
+        for i in np.flatnonzero(bodies.tracked):
+            hand_x, hand_y = self.kinect_manager.body_screen_points(bodies, i)[PyKinectV2.JointType_HandRight]
+            if not np.isnan(hand_x):
+                return (float(hand_x), float(hand_y))
 
-            joints = body.joints
-            joint_points = self.kinect_manager.kinect.body_joints_to_color_space(joints)
-            hand_right = joint_points[PyKinectV2.JointType_HandRight]
+        return None
 
-            if not (hand_right.x == float('inf') or hand_right.y == float('inf')):
-                return (hand_right.x, hand_right.y)
+    def get_head_positions(self):
+        """Head and neck preview pixel positions of every tracked body, keyed by tracking id."""
+        bodies = self.kinect_manager.get_bodies()
+        heads = {}
+        if bodies is None:
+            return heads
 
-        return None
+        for i in np.flatnonzero(bodies.tracked):
+            points = self.kinect_manager.body_color_points(bodies, i)
+            heads[bodies.tracking_ids[i]] = (points[PyKinectV2.JointType_Head], points[PyKinectV2.JointType_Neck])
+
+        return heads
 
     def handle_button_interaction(self, hand_pos):
         if not hand_pos:
@@ -84,6 +109,10 @@ class BaseMenu:
 
         return None
 
+    def render_text(self, font, text, color, antialias=True):
+        """Render text through the shared surface cache. The result is shared, only blit it."""
+        return self.text_cache.render(font, text, color, antialias)
+
     def draw_hold_indicator(self, surface):
         if not self.holding_button or not self.holding_start_time:
             return
@@ -99,21 +128,117 @@ class BaseMenu:
                 break
 
         if target_button:
-            hold_text = self.small_font.render("Holding: {:.1f}s".format(elapsed), True, self.holding_text_color)
+            hold_text = self.render_text(self.small_font, "Holding: {:.1f}s".format(elapsed), self.holding_text_color)
             text_x = target_button.rect.centerx - hold_text.get_width() // 2
             text_y = target_button.rect.top - hold_text.get_height() - 10
-            surface.blit(hold_text, (text_x, text_y))
+            self.mark_dirty(surface.blit(hold_text, (text_x, text_y)))
 
     def draw_background(self, surface):
         surface.fill(self.bg_color)
-        color_frame_surface = self.kinect_manager.get_color_frame()
+        color_frame_surface = self.kinect_manager.get_color_frame() if self.camera_background else None
         if color_frame_surface:
             if self.blur_effect.enabled:
-                color_frame_surface = self.blur_effect.apply_blur(color_frame_surface)
-            surface.blit(color_frame_surface, (0, 0))
+                heads = self.get_head_positions() if self.blur_effect.face_mode else None
+                color_frame_surface = self.blur_effect.apply_blur(color_frame_surface, heads)
+            surface.blit(self.kinect_manager.scale_to_display(color_frame_surface, surface.get_size()), (0, 0))
+
+    def mark_dirty(self, rect):
+        """Record a screen area changed by draw_dynamic so only it is pushed to the display."""
+        if rect is not None:
+            self._dirty_rects.append(pygame.Rect(rect))
+        return rect
+
+    def invalidate(self):
+        """Force a full-frame redraw on the next draw_layered call."""
+        self._needs_full_redraw = True
+
+    def invalidate_static(self):
+        """Re-render the cached static layer, e.g. after a button label or page content changed."""
+        self._static_layer = None
+        self._needs_full_redraw = True
+
+    def get_static_layer(self, size):
+        if self._static_layer is None or self._static_layer.get_size() != size:
+            self._static_layer = pygame.Surface(size, pygame.SRCALPHA)
+            self.draw_static(self._static_layer)
+        return self._static_layer
+
+    def on_enter(self):
+        """Called by KinectApp every time the menu becomes the current screen. Resets per-visit state."""
+        self.holding_start_time = None
+        self.holding_button = None
+        self.invalidate()
+
+    def on_exit(self):
+        """Called by KinectApp when navigating away from the menu."""
+        pass
+
+    def close(self):
+        """Called by KinectApp on shutdown to release resources such as worker processes."""
+        pass
+
+    def needs_update(self, snapshot):
+        """Whether update() has anything to do: new sensor data or a button hold that may complete."""
+        return snapshot.has_new_bodies or snapshot.has_new_color or self.holding_button is not None
+
+    def needs_redraw(self, snapshot):
+        """Whether the next frame would look different from the last one drawn."""
+        return (self._needs_full_redraw or self.holding_button is not None
+                or self.holding_button != self._drawn_holding_button
+                or (self.camera_background and snapshot.has_new_color))
 
     def update(self, surface):
         pass
 
+    def draw_static(self, surface):
+        """Parts of the menu that only change on invalidate_static(): titles, labels, buttons."""
+        for button in self.buttons:
+            button.draw(surface)
+
+    def draw_dynamic(self, surface):
+        """Per-frame overlays. Every area drawn here must be reported through mark_dirty()."""
+        self.draw_hold_indicator(surface)
+
     def draw(self, surface):
-        pass
+        self.draw_background(surface)
+        self.draw_static(surface)
+        self._dirty_rects = []
+        self.draw_dynamic(surface)
+        self._drawn_holding_button = self.holding_button
+
+    def draw_layered(self, surface):
+        """Draw using the cached static layer and return the changed rectangles.
+
+        Returns None when the whole frame changed (new camera frame or
+        invalidated menu), otherwise the list of areas the previous and the
+        current dynamic overlays cover.
+        """
+        size = surface.get_size()
+        static_layer = self.get_static_layer(size)
+        snapshot = self.kinect_manager.get_snapshot()
+        background_changed = self.camera_background and snapshot.has_new_color
+
+        if self._needs_full_redraw or background_changed or self._base_layer is None \
+                or self._base_layer.get_size() != size:
+            # The base layer is the background with the static layer on top;
+            # dynamic overlays are erased by copying it back.
+            if self._base_layer is None or self._base_layer.get_size() != size:
+                self._base_layer = pygame.Surface(size, 0, surface)
+            self.draw_background(self._base_layer)
+            self._base_layer.blit(static_layer, (0, 0))
+            surface.blit(self._base_layer, (0, 0))
+            self._dirty_rects = []
+            self.draw_dynamic(surface)
+            self._previous_dirty_rects = self._dirty_rects
+            self._drawn_holding_button = self.holding_button
+            self._needs_full_redraw = False
+            return None
+
+        for rect in self._previous_dirty_rects:
+            surface.blit(self._base_layer, rect, rect)
+        self._dirty_rects = []
+        self.draw_dynamic(surface)
+        self._drawn_holding_button = self.holding_button
+        dirty_rects = self._previous_dirty_rects + self._dirty_rects
+        self._previous_dirty_rects = self._dirty_rects
+        return dirty_rects
@@ -1,10 +1,10 @@
-import pygame
 from gui.base_menu import BaseMenu
 from button import Button
+from font_registry import get_font
 
 class ExerciseMenu(BaseMenu):
-    def __init__(self, kinect_manager, config):
-        super().__init__(kinect_manager, config)
+    def __init__(self, kinect_manager, config, blur_effect=None):
+        super().__init__(kinect_manager, config, blur_effect)
 
         colors_cfg = config.get("colors", {})
         buttons_cfg = config.get("buttons", {})
@@ -17,7 +17,7 @@ class ExerciseMenu(BaseMenu):
         button_border_width = buttons_cfg.get("border_width", 2)
         min_font_size = buttons_cfg.get("min_font_size", 14)
 
-        self.medium_font = pygame.font.SysFont(font_name, medium_size)
+        self.medium_font = get_font(font_name, medium_size)
         self.exercise_buttons = []
 
         squats_cfg = exercises_cfg.get("squats", {})
@@ -121,14 +121,12 @@ class ExerciseMenu(BaseMenu):
         hand_pos = self.get_hand_position()
         return self.handle_button_interaction(hand_pos)
 
-    def draw(self, surface):
-        self.draw_background(surface)
-        title_surface = self.title_font.render("Choose Exercise", True, self.text_color)
+    def draw_static(self, surface):
+        title_surface = self.render_text(self.title_font, "Choose Exercise", self.text_color)
         title_rect = title_surface.get_rect(center=(surface.get_width() // 2, 150))
         surface.blit(title_surface, title_rect)
-        subtitle_surface = self.font.render("Select your workout:", True, self.text_color)
+        subtitle_surface = self.render_text(self.font, "Select your workout:", self.text_color)
         subtitle_rect = subtitle_surface.get_rect(center=(surface.get_width() // 2, 220))
         surface.blit(subtitle_surface, subtitle_rect)
         for button in self.buttons:
-            button.draw(surface)
-        self.draw_hold_indicator(surface)
\ No newline at end of file
+            button.draw(surface)
\ No newline at end of file
@@ -1,29 +1,40 @@
 import pygame
+import numpy as np
 from gui.base_menu import BaseMenu
 from button import Button
 from skeleton_renderer import SkeletonRenderer
 from leaderboard.leaderboard_manager import LeaderboardManager
+from exercises.base_exercises import detect_exercise_batch
+from kinect_compat import PyKinectV2
 
 class ExerciseRunner(BaseMenu):
-    def __init__(self, kinect_manager, config, exercise_type):
-        super().__init__(kinect_manager, config)
+    def __init__(self, kinect_manager, config, exercise_type, leaderboard=None, blur_effect=None):
+        super().__init__(kinect_manager, config, blur_effect)
         self.exercise_type = exercise_type
         self.skeleton_renderer = SkeletonRenderer(kinect_manager, config)
-        self.leaderboard = LeaderboardManager()
-        self.session_recorded = False
-        self.exercise_detector = None
+        if leaderboard is None:
+            leaderboard = LeaderboardManager()
+        self.leaderboard = leaderboard
+        self.exercise_class = None
         if exercise_type == "squats":
             from exercises.squats import SquatsExercise
-            self.exercise_detector = SquatsExercise(config)
+            self.exercise_class = SquatsExercise
         elif exercise_type == "jumping_jacks":
             from exercises.jumping_jacks import JumpingJacksExercise
-            self.exercise_detector = JumpingJacksExercise(config)
+            self.exercise_class = JumpingJacksExercise
         elif exercise_type == "bicep_curls":
             from exercises.bicep_curls import BicepCurlsExercise
-            self.exercise_detector = BicepCurlsExercise(config)
+            self.exercise_class = BicepCurlsExercise
         elif exercise_type == "arm_raises":
             from exercises.arm_raises import ArmRaisesExercise
-            self.exercise_detector = ArmRaisesExercise(config)
+            self.exercise_class = ArmRaisesExercise
+
+        # In multi-body mode every tracked person gets their own detector,
+        # keyed by the sensor's tracking id. The first person reuses
+        # exercise_detector, which also drives the detailed stats panel.
+        runner_cfg = config.get("exercise_runner", {})
+        self.multi_body = runner_cfg.get("multi_body", False)
+        self.reset_session()
 
         colors_cfg = config.get("colors", {})
         buttons_cfg = config.get("buttons", {})
@@ -58,99 +69,156 @@ class ExerciseRunner(BaseMenu):
         }
         self.current_title = self.exercise_titles.get(self.exercise_type, "Exercise Mode")
 
+    def reset_session(self):
+        """Start counting from zero with fresh detectors, ignoring body frames captured before now."""
+        self.exercise_detector = self.exercise_class(self.config) if self.exercise_class else None
+        self.body_detectors = {}
+        self.body_labels = {}
+        self.session_recorded = False
+        self.last_body_seq = self.kinect_manager.get_snapshot().body_seq
+        self.skeleton_renderer.reset()
+
+    def on_enter(self):
+        super().on_enter()
+        self.reset_session()
+
     def update(self, surface):
         hand_pos = self.get_hand_position()
         action = self.handle_button_interaction(hand_pos)
         
         if action == "back" and self.exercise_detector and not self.session_recorded:
-            reps = self.exercise_detector.rep_count
-            if reps > 0:
-                self.leaderboard.record_session(self.exercise_type, reps, self.exercise_detector)
-                self.session_recorded = True
+            self.record_sessions()
         
-        if self.exercise_detector:
-            bodies = self.kinect_manager.get_bodies()
-            if bodies is not None:
-                for i in range(self.kinect_manager.kinect.max_body_count):
-                    body = bodies.bodies[i]
-                    if body.is_tracked:
-                        self.exercise_detector.detect_exercise(body.joints)
-                        break
+        # Feed the detectors every body frame captured since the last update so
+        # rep counting keeps the sensor rate even when rendering is slower.
+        for frame in self.kinect_manager.body_frames_since(self.last_body_seq):
+            self.last_body_seq = frame.seq
+            if not self.exercise_detector:
+                continue
+            tracked = np.flatnonzero(frame.data.tracked)
+            if not self.multi_body:
+                tracked = tracked[:1]
+            detectors = [self.get_body_detector(frame.data.tracking_ids[i]) for i in tracked]
+            detect_exercise_batch(detectors, frame.data.joints[tracked])
         return action
 
-    def draw(self, surface):
-        self.draw_background(surface)
-        bodies = self.kinect_manager.get_bodies()
-        self.skeleton_renderer.draw(bodies, surface)
-        title_surface = self.font.render(self.current_title, True, self.text_color)
+    def needs_redraw(self, snapshot):
+        # Keep drawing while the skeleton is still moving between two body frames
+        return (super().needs_redraw(snapshot) or snapshot.has_new_bodies
+                or self.skeleton_renderer.is_animating())
+
+    def get_body_detector(self, tracking_id):
+        if not self.multi_body:
+            return self.exercise_detector
+        detector = self.body_detectors.get(tracking_id)
+        if detector is None:
+            detector = self.exercise_class(self.config) if self.body_detectors else self.exercise_detector
+            self.body_detectors[tracking_id] = detector
+            self.body_labels[tracking_id] = "P{}".format(len(self.body_detectors))
+        return detector
+
+    def record_sessions(self):
+        """Record one leaderboard session per person who completed at least one rep."""
+        detectors = list(self.body_detectors.values()) if self.multi_body else [self.exercise_detector]
+        recorded = [detector for detector in detectors if detector.rep_count > 0]
+        for detector in recorded:
+            self.leaderboard.record_session(self.exercise_type, detector.rep_count, detector, save=False)
+        if recorded:
+            self.leaderboard.save_data()
+            self.session_recorded = True
+
+    def draw_person_counters(self, surface, bodies):
+        if bodies is None:
+            return
+        for i in np.flatnonzero(bodies.tracked):
+            tracking_id = bodies.tracking_ids[i]
+            detector = self.body_detectors.get(tracking_id)
+            if detector is None:
+                continue
+            head_x, head_y = self.kinect_manager.body_screen_points(bodies, i)[PyKinectV2.JointType_Head]
+            if np.isnan(head_x):
+                continue
+            label = "{}: {} reps".format(self.body_labels[tracking_id], detector.rep_count)
+            label_surface = self.render_text(self.font, label, self.text_color)
+            label_rect = label_surface.get_rect(midbottom=(int(head_x), int(head_y) - 40))
+            self.mark_dirty(surface.blit(label_surface, label_rect))
+
+    def draw_static(self, surface):
+        title_surface = self.render_text(self.font, self.current_title, self.text_color)
         surface.blit(title_surface, (50, 50))
+        self.back_button.draw(surface)
+
+    def draw_dynamic(self, surface):
+        bodies = self.kinect_manager.get_bodies()
+        self.mark_dirty(self.skeleton_renderer.draw(bodies, surface))
+        if self.multi_body:
+            self.draw_person_counters(surface, bodies)
 
         if self.exercise_detector:
             progress = self.exercise_detector.get_progress_info()
             rep_text = "Reps: {}".format(progress['reps'])
-            rep_surface = self.font.render(rep_text, True, self.text_color)
-            surface.blit(rep_surface, (50, 100))
+            rep_surface = self.render_text(self.font, rep_text, self.text_color)
+            self.mark_dirty(surface.blit(rep_surface, (50, 100)))
             if progress['state'] != "ready":
                 state_text = "State: {}".format(progress['state'].replace('_', ' ').title())
-                state_surface = self.small_font.render(state_text, True, self.text_color)
-                surface.blit(state_surface, (50, 150))
+                state_surface = self.render_text(self.small_font, state_text, self.text_color)
+                self.mark_dirty(surface.blit(state_surface, (50, 150)))
             feedback_text = "Form: {}".format(progress['form_feedback'])
-            feedback_surface = self.small_font.render(feedback_text, True, self.text_color)
-            surface.blit(feedback_surface, (50, 180))
+            feedback_surface = self.render_text(self.small_font, feedback_text, self.text_color)
+            self.mark_dirty(surface.blit(feedback_surface, (50, 180)))
             if 'hand_head_distance' in progress:
                 hand_text = "Hand-Head: {}m (Up: >{}m)".format(progress['hand_head_distance'], progress['arms_up_threshold'])
                 hand_color = (0, 255, 0) if progress['hand_head_distance'] > progress['arms_up_threshold'] else (255, 255, 255)
-                hand_surface = self.small_font.render(hand_text, True, hand_color)
-                surface.blit(hand_surface, (50, 210))
+                hand_surface = self.render_text(self.small_font, hand_text, hand_color)
+                self.mark_dirty(surface.blit(hand_surface, (50, 210)))
 
                 foot_text = "Foot Distance: {}m (Apart: >{}m)".format(progress['foot_distance'], progress['legs_apart_threshold'])
                 foot_color = (0, 255, 0) if progress['foot_distance'] > progress['legs_apart_threshold'] else (255, 255, 255)
-                foot_surface = self.small_font.render(foot_text, True, foot_color)
-                surface.blit(foot_surface, (50, 240))
+                foot_surface = self.render_text(self.small_font, foot_text, foot_color)
+                self.mark_dirty(surface.blit(foot_surface, (50, 240)))
 
                 arms_status = "UP" if progress['arms_up'] else "DOWN"
                 legs_status = "APART" if progress['legs_apart'] else "TOGETHER"
                 status_text = "Arms: {} | Legs: {}".format(arms_status, legs_status)
-                status_surface = self.small_font.render(status_text, True, (255, 255, 0))
-                surface.blit(status_surface, (50, 270))
+                status_surface = self.render_text(self.small_font, status_text, (255, 255, 0))
+                self.mark_dirty(surface.blit(status_surface, (50, 270)))
 
             if 'avg_hand_shoulder_distance' in progress:
                 avg_distance_text = "Avg Hand-Shoulder: {}m".format(progress['avg_hand_shoulder_distance'])
-                avg_surface = self.small_font.render(avg_distance_text, True, (255, 255, 255))
-                surface.blit(avg_surface, (50, 210))
+                avg_surface = self.render_text(self.small_font, avg_distance_text, (255, 255, 255))
+                self.mark_dirty(surface.blit(avg_surface, (50, 210)))
 
                 left_text = "Left: {}m".format(progress['left_hand_shoulder_distance'])
                 left_color = (0, 255, 0) if progress['left_hand_shoulder_distance'] < progress['curled_threshold'] else (255, 255, 255)
-                left_surface = self.small_font.render(left_text, True, left_color)
-                surface.blit(left_surface, (50, 240))
+                left_surface = self.render_text(self.small_font, left_text, left_color)
+                self.mark_dirty(surface.blit(left_surface, (50, 240)))
 
                 right_text = "Right: {}m".format(progress['right_hand_shoulder_distance'])
                 right_color = (0, 255, 0) if progress['right_hand_shoulder_distance'] < progress['curled_threshold'] else (255, 255, 255)
-                right_surface = self.small_font.render(right_text, True, right_color)
-                surface.blit(right_surface, (200, 240))
+                right_surface = self.render_text(self.small_font, right_text, right_color)
+                self.mark_dirty(surface.blit(right_surface, (200, 240)))
 
                 curl_status = "CURLED" if progress['is_curled'] else "EXTENDED"
-                curl_surface = self.small_font.render("Position: {}".format(curl_status), True, (255, 255, 0))
-                surface.blit(curl_surface, (50, 270))
+                curl_surface = self.render_text(self.small_font, "Position: {}".format(curl_status), (255, 255, 0))
+                self.mark_dirty(surface.blit(curl_surface, (50, 270)))
 
             if 'avg_hand_shoulder_height' in progress:
                 avg_height_text = "Avg Hand Height: {}m".format(progress['avg_hand_shoulder_height'])
-                avg_surface = self.small_font.render(avg_height_text, True, (255, 255, 255))
-                surface.blit(avg_surface, (50, 210))
+                avg_surface = self.render_text(self.small_font, avg_height_text, (255, 255, 255))
+                self.mark_dirty(surface.blit(avg_surface, (50, 210)))
 
                 left_text = "Left: {}m".format(progress['left_hand_shoulder_height'])
                 left_color = (0, 255, 0) if progress['left_hand_shoulder_height'] > progress['raised_threshold'] else (255, 255, 255)
-                left_surface = self.small_font.render(left_text, True, left_color)
-                surface.blit(left_surface, (50, 240))
+                left_surface = self.render_text(self.small_font, left_text, left_color)
+                self.mark_dirty(surface.blit(left_surface, (50, 240)))
 
                 right_text = "Right: {}m".format(progress['right_hand_shoulder_height'])
                 right_color = (0, 255, 0) if progress['right_hand_shoulder_height'] > progress['raised_threshold'] else (255, 255, 255)
-                right_surface = self.small_font.render(right_text, True, right_color)
-                surface.blit(right_surface, (200, 240))
+                right_surface = self.render_text(self.small_font, right_text, right_color)
+                self.mark_dirty(surface.blit(right_surface, (200, 240)))
 
                 raise_status = "RAISED" if progress['are_raised'] else "LOWERED"
-                raise_surface = self.small_font.render("Position: {}".format(raise_status), True, (255, 255, 0))
-                surface.blit(raise_surface, (50, 270))
+                raise_surface = self.render_text(self.small_font, "Position: {}".format(raise_status), (255, 255, 0))
+                self.mark_dirty(surface.blit(raise_surface, (50, 270)))
 
-        self.back_button.draw(surface)
         self.draw_hold_indicator(surface)
\ No newline at end of file
@@ -3,8 +3,8 @@ from gui.base_menu import BaseMenu
 from button import Button
 
 class MainMenu(BaseMenu):
-    def __init__(self, kinect_manager, config):
-        super().__init__(kinect_manager, config)
+    def __init__(self, kinect_manager, config, blur_effect=None):
+        super().__init__(kinect_manager, config, blur_effect)
         colors_cfg = config.get("colors", {})
         buttons_cfg = config.get("buttons", {})
         fonts_cfg = config.get("fonts", {})
@@ -84,13 +84,10 @@ class MainMenu(BaseMenu):
         hand_pos = self.get_hand_position()
         return self.handle_button_interaction(hand_pos)
 
-    def draw(self, surface):
-        self.draw_background(surface)
-        title_surface = self.title_font.render(self.title, True, self.text_color)
+    def draw_static(self, surface):
+        title_surface = self.render_text(self.title_font, self.title, self.text_color)
         title_rect = title_surface.get_rect(center=(surface.get_width() // 2, 200))
         surface.blit(title_surface, title_rect)
         
         for button in self.buttons:
-            button.draw(surface)
-            
-        self.draw_hold_indicator(surface)
\ No newline at end of file
+            button.draw(surface)
\ No newline at end of file
@@ -0,0 +1,166 @@
+import multiprocessing
+import queue
+
+import numpy as np
+
+# Indices into the shared triple-buffer state: the slot the UI writes next,
+# the newest complete frame, and the slot the worker is reading.
+BACK, READY, FRONT = 0, 1, 2
+SLOT_COUNT = 3
+
+def _slot_head(heads, slot):
+    head_x, head_y, neck_x, neck_y = heads[slot * 4:slot * 4 + 4]
+    if np.isnan(head_x):
+        return None
+    return (head_x, head_y), (neck_x, neck_y)
+
+def _worker_main(config, shape, dtype, slots, timestamps, heads, state, lock, frame_ready, commands, statuses,
+                 status_interval):
+    # Imported here so the UI process never loads the face cascade
+    from heartrate.heart_rate_detector import HeartRateDetector
+
+    detector = HeartRateDetector(config)
+    frames = [np.frombuffer(slot, dtype=dtype).reshape(shape) for slot in slots]
+    generation = None
+    while True:
+        while True:
+            try:
+                command = commands.get_nowait()
+            except queue.Empty:
+                break
+            if command[0] == "stop":
+                # Do not wait for the UI to read statuses it no longer wants
+                statuses.cancel_join_thread()
+                return
+            if command[0] == "reset":
+                generation = command[1]
+                detector.reset()
+                statuses.put((generation, detector.get_status_info()))
+            elif command[0] == "pause":
+                generation = None
+
+        if not frame_ready.wait(status_interval):
+            # Only the recording timer moves without new frames. Nothing is
+            # posted during the countdown or after the result, so an unpolled
+            # queue stays short.
+            if generation is not None and detector.is_recording:
+                statuses.put((generation, detector.get_status_info()))
+            continue
+        with lock:
+            state[FRONT], state[READY] = state[READY], state[FRONT]
+            frame_ready.clear()
+        if generation is None:
+            continue
+        front = state[FRONT]
+        detector.process_frame(frames[front], timestamps[front] or None, _slot_head(heads, front))
+        statuses.put((generation, detector.get_status_info()))
+
+class HeartRateWorker:
+    """Runs a HeartRateDetector in a separate process, with the same interface the monitor uses.
+
+    Frames are handed over through a triple buffer in shared memory: the UI
+    always writes into a free slot and publishes it as the newest frame, so a
+    worker that falls behind skips straight to the latest frame instead of
+    working through a backlog. The worker answers with status dicts, of which
+    only the newest is kept.
+    """
+
+    def __init__(self, config, status_interval=0.1):
+        self.config = config
+        self.status_interval = status_interval
+        self.process = None
+        self.shape = None
+        self.generation = 0
+        self.status = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def _start(self, shape, dtype):
+        self.close()
+        context = multiprocessing.get_context()
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self.slots = [context.RawArray('B', size) for _ in range(SLOT_COUNT)]
+        self.frames = [np.frombuffer(slot, dtype=dtype).reshape(shape) for slot in self.slots]
+        self.timestamps = context.RawArray('d', SLOT_COUNT)
+        # Head and neck pixel positions per slot, NaN when no head is tracked
+        self.heads = context.RawArray('d', SLOT_COUNT * 4)
+        self.state = context.RawArray('i', [BACK, READY, FRONT])
+        self.lock = context.Lock()
+        self.frame_ready = context.Event()
+        self.commands = context.Queue()
+        self.statuses = context.Queue()
+        self.shape = shape
+        self.dtype = dtype
+        self.process = context.Process(
+            target=_worker_main, name="HeartRateWorker",
+            args=(self.config, shape, dtype, self.slots, self.timestamps, self.heads, self.state, self.lock,
+                  self.frame_ready, self.commands, self.statuses, self.status_interval))
+        self.process.daemon = True
+        self.process.start()
+        self.commands.put(("reset", self.generation))
+
+    def reset(self):
+        self.generation += 1
+        self.status = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        if self.process is not None:
+            self.commands.put(("reset", self.generation))
+
+    def pause(self):
+        """Stop processing and reporting until the next reset, e.g. while another menu is shown."""
+        self.generation += 1
+        self.status = None
+        if self.process is not None:
+            self.commands.put(("pause",))
+
+    def process_frame(self, frame, timestamp=None, head=None):
+        if self.process is None or frame.shape != self.shape or frame.dtype != self.dtype:
+            self._start(frame.shape, frame.dtype)
+        back = self.state[BACK]
+        np.copyto(self.frames[back], frame)
+        self.timestamps[back] = timestamp if timestamp is not None else 0.0
+        if head is None:
+            self.heads[back * 4:back * 4 + 4] = [np.nan] * 4
+        else:
+            self.heads[back * 4:back * 4 + 4] = [float(v) for point in head for v in point]
+        with self.lock:
+            if self.frame_ready.is_set():
+                # The worker never picked up the previous frame
+                self.frames_dropped += 1
+            self.state[BACK], self.state[READY] = self.state[READY], back
+            self.frame_ready.set()
+        self.frames_sent += 1
+
+    def poll(self):
+        """Keep the newest status of the current measurement. Never blocks."""
+        if self.process is None:
+            return
+        while True:
+            try:
+                generation, status = self.statuses.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                self.status = status
+
+    @property
+    def processing_done(self):
+        return self.status is not None and self.status['processing_done']
+
+    def get_status_info(self):
+        self.poll()
+        if self.status is None:
+            return None
+        status = dict(self.status)
+        status['frames_dropped'] = self.frames_dropped
+        return status
+
+    def close(self):
+        if self.process is None:
+            return
+        self.commands.put(("stop",))
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
@@ -1,8 +1,23 @@
 import cv2
 import numpy as np
 import time
-from collections import deque
-from scipy import signal as scipy_signal
+from color_frame import preview_scale_from_config
+from heartrate.live_estimator import LiveHeartRateEstimator
+from heartrate.rppg import RPPG_METHODS
+from heartrate.sample_buffer import SampleRingBuffer
+
+# Channels of HeartRateDetector.samples
+RED, GREEN, BLUE, TIME = 0, 1, 2, 3
+
+def nearest_head(heads):
+    """The (head, neck) pixel pair with the longest head-neck distance, i.e. nearest the camera, or None."""
+    best, best_distance = None, 0
+    for pair in heads:
+        head, neck = pair
+        distance = np.hypot(head[0] - neck[0], head[1] - neck[1])
+        if np.isfinite(distance) and distance > best_distance:
+            best, best_distance = pair, distance
+    return best
 
 class HeartRateDetector:
     def __init__(self, config=None):
@@ -12,12 +27,40 @@ class HeartRateDetector:
         hr_config = config.get("heart_rate", {})
         
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+        # Face size limits below are tuned for the native 1920x1080 feed
+        self.pixel_scale = preview_scale_from_config(config)[0]
+        self.min_face_size = int(80 * self.pixel_scale)
+        self.max_face_size = int(400 * self.pixel_scale)
+        self.min_roi_width = int(40 * self.pixel_scale)
+        self.min_roi_height = int(20 * self.pixel_scale)
+
+        # Detect-then-track: the full-frame cascade runs every
+        # detection_interval frames (optionally on a frame downscaled by
+        # detection_scale) or when the face is lost; in between only a window
+        # around the last face, padded by track_padding face sizes, is searched.
+        self.detection_interval = hr_config.get("detection_interval", 15)
+        self.detection_scale = hr_config.get("detection_scale", 1.0)
+        self.track_padding = hr_config.get("track_padding", 0.5)
+        self.last_face = None
+        self.frames_since_full_detection = 0
+        self.detection_mode = None
+        self.detection_ms = 0.0
+        self.frame_ms = 0.0
+
+        # With roi_source "skeleton" the face box is placed on the Kinect Head
+        # joint and sized from the head-neck distance; the cascade only runs
+        # when no head is tracked, and every joint_check_interval frames to
+        # calibrate the box against a detected face (0 disables the checks).
+        self.roi_source = hr_config.get("roi_source", "skeleton")
+        self.joint_face_scale = hr_config.get("joint_face_scale", 1.0)
+        self.joint_check_interval = hr_config.get("joint_check_interval", 30)
+        self.joint_calibration = (0.0, 0.0, self.joint_face_scale)
+        self.frames_since_joint_check = 0
         
         self.max_samples = hr_config.get("max_samples", 900)
-        self.red_signal = deque(maxlen=self.max_samples)
-        self.green_signal = deque(maxlen=self.max_samples)
-        self.blue_signal = deque(maxlen=self.max_samples)
-        self.timestamps = deque(maxlen=self.max_samples)
+        # Mean R, G, B of the forehead ROI and the sample time, one column per frame
+        self.samples = SampleRingBuffer(4, self.max_samples)
         
         self.fps = hr_config.get("fps", 30)
         self.recording_time = hr_config.get("recording_time", 30)
@@ -26,8 +69,32 @@ class HeartRateDetector:
         self.min_hr = hr_config.get("min_hr", 50)
         self.max_hr = hr_config.get("max_hr", 180)
         
+        # Live estimate over the last live_window seconds, refreshed every
+        # live_update_interval. With early_stop the measurement ends once
+        # stable_updates consecutive estimates stay within stable_tolerance
+        # BPM, but not before min_recording_time.
+        # The R, G, B traces are combined into one pulse signal by rppg_method
+        # ("pos", "chrom" or "green"), both for the live and the final estimate.
+        self.rppg_method = hr_config.get("rppg_method", "pos")
+        if self.rppg_method not in RPPG_METHODS:
+            print("Unknown rPPG method: {}, using pos".format(self.rppg_method))
+            self.rppg_method = "pos"
+        self.live_estimator = LiveHeartRateEstimator(self.min_hr, self.max_hr, method=self.rppg_method,
+                                                     pos_window=hr_config.get("pos_window", 1.6))
+        self.live_window = hr_config.get("live_window", 10)
+        self.live_min_window = hr_config.get("live_min_window", 5)
+        self.live_update_interval = hr_config.get("live_update_interval", 1.0)
+        self.early_stop = hr_config.get("early_stop", True)
+        self.stable_updates = hr_config.get("stable_updates", 5)
+        self.stable_tolerance = hr_config.get("stable_tolerance", 3.0)
+        self.min_recording_time = hr_config.get("min_recording_time", 15)
+        self.live_bpm = None
+        self.live_history = []
+        self.last_live_update = None
+        
         self.last_roi = None
         self.start_time = None
+        self.stop_time = None
         self.countdown_start_time = None
         self.last_detection_time = None
         self.is_counting_down = False
@@ -37,47 +104,146 @@ class HeartRateDetector:
         self.current_quality = "INSUFFICIENT"
         
     def reset(self):
-        self.red_signal.clear()
-        self.green_signal.clear()
-        self.blue_signal.clear()
-        self.timestamps.clear()
+        self.samples.clear()
         self.countdown_start_time = time.time()
         self.start_time = None
+        self.stop_time = None
         self.last_detection_time = None
         self.is_counting_down = True
         self.is_recording = False
         self.processing_done = False
         self.final_hr_text = "Get ready..."
         self.current_quality = "INSUFFICIENT"
-        
-    def detect_forehead_roi(self, gray_frame):
-        faces = self.face_cascade.detectMultiScale(
+        self.last_roi = None
+        self.last_face = None
+        self.frames_since_full_detection = 0
+        self.detection_mode = None
+        self.detection_ms = 0.0
+        self.frame_ms = 0.0
+        self.joint_calibration = (0.0, 0.0, self.joint_face_scale)
+        self.frames_since_joint_check = 0
+        self.live_bpm = None
+        self.live_history = []
+        self.last_live_update = None
+        
+    def _detect_faces(self, gray_frame, min_size, max_size):
+        return self.face_cascade.detectMultiScale(
             gray_frame, 
             scaleFactor=1.1, 
             minNeighbors=8, 
-            minSize=(80, 80),
-            maxSize=(400, 400),
+            minSize=(min_size, min_size),
+            maxSize=(max_size, max_size),
             flags=cv2.CASCADE_SCALE_IMAGE
         )
-        
+
+    def _gray(self, frame):
+        """Grayscale copy of a BGR or BGRA frame or of a view into one."""
+        if frame.shape[2] == 4:
+            return cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def _detect_full(self, frame):
+        scale = self.detection_scale
+        if scale >= 1.0:
+            return self._detect_faces(self._gray(frame), self.min_face_size, self.max_face_size)
+        # Downscale before converting, so only the small frame is turned gray
+        small = self._gray(cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA))
+        faces = self._detect_faces(small, max(1, int(self.min_face_size * scale)), int(self.max_face_size * scale))
+        return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+    def _detect_tracked(self, frame):
+        """Search a padded window around the last face, in full-resolution coordinates.
+
+        Only the window is converted to grayscale.
+        """
+        x, y, w, h = self.last_face
+        pad_x, pad_y = int(w * self.track_padding), int(h * self.track_padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1 = min(frame.shape[1], x + w + pad_x)
+        y1 = min(frame.shape[0], y + h + pad_y)
+        # The face cannot change size much between frames
+        min_size = max(self.min_face_size, int(w * 0.7))
+        max_size = min(self.max_face_size, int(w * 1.4), x1 - x0, y1 - y0)
+        if max_size < min_size:
+            return []
+        faces = self._detect_faces(self._gray(frame[y0:y1, x0:x1]), min_size, max_size)
+        return [(fx + x0, fy + y0, fw, fh) for fx, fy, fw, fh in faces]
+
+    def _detect_cascade(self, frame):
+        faces = []
+        if self.last_face is not None and self.frames_since_full_detection < self.detection_interval:
+            faces = self._detect_tracked(frame)
+            self.detection_mode = "track"
+            self.frames_since_full_detection += 1
         if len(faces) == 0:
+            faces = self._detect_full(frame)
+            self.detection_mode = "full"
+            self.frames_since_full_detection = 0
+        if len(faces) == 0:
+            return None
+        return tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+
+    def _face_from_joints(self, frame, head):
+        """Face box around the Head joint, scaled by the head-neck distance, or None if the joints are unusable."""
+        (head_x, head_y), (neck_x, neck_y) = head
+        distance = np.hypot(head_x - neck_x, head_y - neck_y)
+        if not np.isfinite(distance) or distance < 1:
+            return None
+        offset_x, offset_y, scale = self.joint_calibration
+        size = distance * scale
+        center_x = head_x + offset_x * distance
+        center_y = head_y + offset_y * distance
+        face = (int(center_x - size / 2), int(center_y - size / 2), int(size), int(size))
+        self.detection_mode = "skeleton"
+
+        self.frames_since_joint_check += 1
+        if self.joint_check_interval and self.frames_since_joint_check >= self.joint_check_interval:
+            self.frames_since_joint_check = 0
+            self.detection_mode = "skeleton+check"
+            self.last_face = face
+            faces = self._detect_tracked(frame)
+            if len(faces) > 0:
+                x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+                # Move the joint-to-face mapping part of the way towards the detection
+                measured = ((x + w / 2.0 - head_x) / distance, (y + h / 2.0 - head_y) / distance, w / distance)
+                self.joint_calibration = tuple(old + 0.3 * (new - old)
+                                               for old, new in zip(self.joint_calibration, measured))
+        return face
+
+    def detect_forehead_roi(self, frame, head=None):
+        """Forehead box in frame pixels, from the head joints if given and enabled, else from the cascade."""
+        start = time.perf_counter()
+        face = None
+        if head is not None and self.roi_source == "skeleton":
+            face = self._face_from_joints(frame, head)
+            # A distant user or an inferred Neck on top of the Head gives a
+            # box too small to sample; the cascade may still find the face
+            if face is not None and face[2] * face[3] < self.min_face_size * self.min_face_size:
+                face = None
+        if face is None:
+            face = self._detect_cascade(frame)
+        self.detection_ms = (time.perf_counter() - start) * 1000.0
+        
+        if face is None:
             self.last_roi = None
+            self.last_face = None
             return None
             
-        largest_face = max(faces, key=lambda f: f[2] * f[3])
-        x, y, w, h = largest_face
+        x, y, w, h = face
         
         face_area = w * h
-        if face_area < 6400:
+        if face_area < self.min_face_size * self.min_face_size:
             self.last_roi = None
+            self.last_face = None
             return None
+        self.last_face = (x, y, w, h)
             
         roi_x = x + w // 4
         roi_y = y + int(h * 0.15)
         roi_width = w // 2
         roi_height = h // 5
         
-        if roi_width < 40 or roi_height < 20:
+        if roi_width < self.min_roi_width or roi_height < self.min_roi_height:
             self.last_roi = None
             return None
         
@@ -98,63 +264,16 @@ class HeartRateDetector:
         if roi_region.size == 0:
             return None, None, None
             
-        red_mean = np.mean(roi_region[:, :, 2])
-        green_mean = np.mean(roi_region[:, :, 1])
-        blue_mean = np.mean(roi_region[:, :, 0])
-        
-        return red_mean, green_mean, blue_mean
+        # One pass over the view; cv2.mean reports channels in B, G, R(, A) order
+        means = cv2.mean(roi_region)
         
-    def simple_bandpass_filter(self, data, fs, lowcut=0.8, highcut=3.0, order=4):
-        nyquist = 0.5 * fs
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        
-        if low >= 1.0 or high >= 1.0:
-            return data
-            
-        try:
-            b, a = scipy_signal.butter(order, [low, high], btype='band')
-            return scipy_signal.filtfilt(b, a, data)
-        except:
-            return data
-            
-    def estimate_heart_rate_fft(self, signal_data, fs):
-        if len(signal_data) < 100:
-            return None
-            
-        signal_array = np.array(signal_data)
-        
-        if np.std(signal_array) == 0:
-            return None
-            
-        signal_normalized = (signal_array - np.mean(signal_array)) / np.std(signal_array)
-        
-        filtered_signal = self.simple_bandpass_filter(signal_normalized, fs)
-        
-        fft = np.abs(np.fft.fft(filtered_signal))
-        freqs = np.fft.fftfreq(len(filtered_signal), 1.0/fs)
-        
-        min_freq = self.min_hr / 60.0
-        max_freq = self.max_hr / 60.0
-        valid_indices = np.where((freqs >= min_freq) & (freqs <= max_freq))[0]
-        
-        if len(valid_indices) == 0:
-            return None
-            
-        valid_fft = fft[valid_indices]
-        valid_freqs = freqs[valid_indices]
-        peak_idx = np.argmax(valid_fft)
-        peak_freq = valid_freqs[peak_idx]
-        
-        heart_rate = peak_freq * 60
-        
-        return heart_rate if self.min_hr <= heart_rate <= self.max_hr else None
+        return means[2], means[1], means[0]
         
     def get_signal_quality(self, signal_data):
         if len(signal_data) < 30:
             return "INSUFFICIENT"
             
-        std_dev = np.std(np.array(signal_data))
+        std_dev = np.std(signal_data)
         if std_dev < 0.5:
             return "POOR"
         elif std_dev < 2.0:
@@ -162,7 +281,12 @@ class HeartRateDetector:
         else:
             return "GOOD"
             
-    def process_frame(self, frame):
+    def process_frame(self, frame, timestamp=None, head=None):
+        """Sample one BGR(A) frame.
+
+        timestamp is its capture time, defaulting to now; head is the
+        (head, neck) pixel pair of the person being measured, if tracked.
+        """
         if self.processing_done:
             return
             
@@ -179,32 +303,70 @@ class HeartRateDetector:
         if not self.is_recording:
             return
             
-        if frame.shape[2] == 4:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        frame_start = time.perf_counter()
+        self._sample_frame(frame, timestamp, head)
+        self.frame_ms = (time.perf_counter() - frame_start) * 1000.0
+        
+        now = time.time()
+        if self.last_live_update is None or now - self.last_live_update >= self.live_update_interval:
+            self.last_live_update = now
+            self.update_live_estimate()
+        
+        if self.start_time and now - self.start_time >= self.recording_time:
+            self._process_final_heart_rate()
+        elif self.early_stop and self.is_live_stable() and now - self.start_time >= self.min_recording_time:
+            self._finish_live()
             
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def measured_fs(self):
+        """Sample rate from the recorded timestamps, which may be below the nominal fps."""
+        count = len(self.samples)
+        if count < 2:
+            return 0
+        timestamps = self.samples.last()[TIME]
+        duration = timestamps[-1] - timestamps[0]
+        return (count - 1) / duration if duration > 0 else 0
+
+    def update_live_estimate(self):
+        count = len(self.samples)
+        fs = self.measured_fs()
+        if fs <= 0 or count < self.live_min_window * fs:
+            return
+        # Window length from the snapped rate, so jitter does not change it between updates
+        window = min(count, int(self.live_window * self.live_estimator.snap(fs)))
+        self.live_bpm = self.live_estimator.estimate_rgb(self.samples.last(window)[RED:BLUE + 1], fs)[0]
+        if self.live_bpm is None:
+            self.live_history = []
+        else:
+            self.live_history = (self.live_history + [self.live_bpm])[-self.stable_updates:]
+            
+    def is_live_stable(self):
+        if len(self.live_history) < self.stable_updates:
+            return False
+        return max(self.live_history) - min(self.live_history) <= 2 * self.stable_tolerance
         
-        roi = self.detect_forehead_roi(gray)
+    def _finish_live(self):
+        self.processing_done = True
+        self.is_recording = False
+        self.stop_time = time.time()
+        self.final_hr_text = "HR: {:.1f} BPM (Live, stable)".format(np.median(self.live_history))
+            
+    def _sample_frame(self, frame, timestamp=None, head=None):
+        roi = self.detect_forehead_roi(frame, head)
         
         if self.last_detection_time and time.time() - self.last_detection_time > self.no_detection_timeout:
             self.processing_done = True
             self.is_recording = False
+            self.stop_time = time.time()
             self.final_hr_text = "Insufficient data - no face detected"
             return
         
         red_val, green_val, blue_val = self.extract_roi_signal(frame, roi)
         
         if green_val is not None:
-            self.red_signal.append(red_val)
-            self.green_signal.append(green_val)
-            self.blue_signal.append(blue_val)
-            self.timestamps.append(time.time())
+            self.samples.append((red_val, green_val, blue_val, time.time() if timestamp is None else timestamp))
             
-            if len(self.green_signal) > 30:
-                self.current_quality = self.get_signal_quality(list(self.green_signal)[-30:])
-        
-        if self.start_time and time.time() - self.start_time >= self.recording_time:
-            self._process_final_heart_rate()
+            if len(self.samples) > 30:
+                self.current_quality = self.get_signal_quality(self.samples.last(30)[GREEN])
             
     def _process_final_heart_rate(self):
         if self.processing_done:
@@ -212,33 +374,20 @@ class HeartRateDetector:
             
         self.processing_done = True
         self.is_recording = False
+        self.stop_time = time.time()
         self.final_hr_text = "Unable to detect HR"
         
-        if len(self.green_signal) > 300:
-            hr_results = {}
-            
-            for name, data in [('Red', self.red_signal), ('Green', self.green_signal), ('Blue', self.blue_signal)]:
-                hr = self.estimate_heart_rate_fft(list(data), self.fps)
-                if hr:
-                    hr_results[name] = hr
-                    
-            if hr_results:
-                if 'Green' in hr_results:
-                    final_hr = hr_results['Green']
-                    method = "Green"
-                else:
-                    final_hr = np.median(list(hr_results.values()))
-                    method = "Multi"
-                    
-                hr_std = np.std(list(hr_results.values()))
-                if hr_std < 5:
+        if len(self.samples) > 300:
+            final_hr, snr = self.live_estimator.estimate_rgb(self.samples.last()[RED:BLUE + 1], self.measured_fs())
+            if final_hr:
+                if snr >= 3:
                     confidence = "High"
-                elif hr_std < 10:
+                elif snr >= 0:
                     confidence = "Med"
                 else:
                     confidence = "Low"
                     
-                self.final_hr_text = "HR: {:.1f} BPM ({}, {})".format(final_hr, method, confidence)
+                self.final_hr_text = "HR: {:.1f} BPM ({}, {})".format(final_hr, self.rppg_method.upper(), confidence)
             else:
                 self.final_hr_text = "No valid HR detected"
         else:
@@ -253,7 +402,8 @@ class HeartRateDetector:
         if not self.start_time:
             return 0
         if self.processing_done:
-            return self.recording_time
+            # Early stops end before recording_time
+            return min(self.stop_time - self.start_time, self.recording_time)
         return time.time() - self.start_time
         
     def get_countdown_remaining(self):
@@ -263,7 +413,7 @@ class HeartRateDetector:
         return max(0, self.countdown_time - elapsed)
         
     def get_samples_collected(self):
-        return len(self.green_signal)
+        return len(self.samples)
         
     def get_status_info(self):
         return {
@@ -276,5 +426,10 @@ class HeartRateDetector:
             'samples_collected': self.get_samples_collected(),
             'signal_quality': self.current_quality,
             'final_hr_text': self.final_hr_text,
-            'roi': self.get_roi_for_display()
+            'roi': self.get_roi_for_display(),
+            'detection_mode': self.detection_mode,
+            'detection_ms': self.detection_ms,
+            'frame_ms': self.frame_ms,
+            'live_bpm': self.live_bpm,
+            'live_stable': self.is_live_stable()
         }
\ No newline at end of file
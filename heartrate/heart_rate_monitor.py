@@ -1,15 +1,20 @@
 import pygame
-import cv2
-import numpy as np
 from gui.base_menu import BaseMenu
 from button import Button
-from heartrate.heart_rate_detector import HeartRateDetector
+from heartrate.heart_rate_detector import HeartRateDetector, nearest_head
+from heartrate.detector_worker import HeartRateWorker
 
 class HeartRateMonitor(BaseMenu):
-    def __init__(self, kinect_manager, config):
-        super().__init__(kinect_manager, config)
+    def __init__(self, kinect_manager, config, blur_effect=None):
+        super().__init__(kinect_manager, config, blur_effect)
         
-        self.hr_detector = HeartRateDetector(config)
+        # With worker_process the detector runs in its own process so face
+        # detection never stalls the UI loop
+        self.worker_process = config.get("heart_rate", {}).get("worker_process", False)
+        if self.worker_process:
+            self.hr_detector = HeartRateWorker(config)
+        else:
+            self.hr_detector = HeartRateDetector(config)
         
         colors_cfg = config.get("colors", {})
         buttons_cfg = config.get("buttons", {})
@@ -50,32 +55,54 @@ class HeartRateMonitor(BaseMenu):
         self.buttons = [self.back_button, self.start_button]
         
         self.measurement_started = False
+
+    def on_enter(self):
+        super().on_enter()
+        if self.measurement_started:
+            self.hr_detector.reset()
+            self.measurement_started = False
+            self.start_button.update_text("Start Measurement")
+            self.invalidate_static()
+
+    def on_exit(self):
+        super().on_exit()
+        if self.worker_process:
+            # Nothing polls the worker while another menu is shown
+            self.hr_detector.pause()
+
+    def close(self):
+        if self.worker_process:
+            self.hr_detector.close()
+        
+    def needs_redraw(self, snapshot):
+        # Countdown and recording timers change every frame until the result is in
+        measuring = self.measurement_started and not self.hr_detector.processing_done
+        return measuring or super().needs_redraw(snapshot)
+        
+    def start_measurement(self):
+        self.hr_detector.reset()
+        self.measurement_started = True
+        self.start_button.update_text("Restart Measurement")
+        self.invalidate_static()
         
     def update(self, surface):
         hand_pos = self.get_hand_position()
         action = self.handle_button_interaction(hand_pos)
         
         if action == "start_hr":
-            self.hr_detector.reset()
-            self.measurement_started = True
-            self.start_button.update_text("Restart Measurement")
+            self.start_measurement()
             action = None
             
-        if self.measurement_started:
-            color_frame_surface = self.kinect_manager.get_color_frame()
-            if color_frame_surface:
-                frame_array = pygame.surfarray.array3d(color_frame_surface)
-                frame_array = np.transpose(frame_array, (1, 0, 2))
-                frame_array = cv2.cvtColor(frame_array, cv2.COLOR_RGB2BGR)
-                
-                self.hr_detector.process_frame(frame_array)
+        snapshot = self.kinect_manager.get_snapshot()
+        if self.measurement_started and snapshot.has_new_color and snapshot.color_frame is not None:
+            # Raw BGRA preview frame; the detector only reads views of it
+            head = nearest_head(self.get_head_positions().values())
+            self.hr_detector.process_frame(snapshot.color_frame, snapshot.color_timestamp, head)
         
         return action
     
-    def draw(self, surface):
-        self.draw_background(surface)
-        
-        title_surface = self.title_font.render("Heart Rate Monitor (Experimental)", True, self.text_color)
+    def draw_static(self, surface):
+        title_surface = self.render_text(self.title_font, "Heart Rate Monitor (Experimental)", self.text_color)
         title_rect = title_surface.get_rect(center=(surface.get_width() // 2, 100))
         surface.blit(title_surface, title_rect)
         
@@ -88,43 +115,51 @@ class HeartRateMonitor(BaseMenu):
             ]
             
             for i, instruction in enumerate(instructions):
-                inst_surface = self.font.render(instruction, True, self.text_color)
+                inst_surface = self.render_text(self.font, instruction, self.text_color)
                 inst_rect = inst_surface.get_rect(center=(surface.get_width() // 2, 250 + i * 40))
                 surface.blit(inst_surface, inst_rect)
-        else:
-            status = self.hr_detector.get_status_info()
-            
+
+        for button in self.buttons:
+            button.draw(surface)
+
+    def draw_dynamic(self, surface):
+        status = self.hr_detector.get_status_info() if self.measurement_started else None
+        if self.measurement_started and status is None:
+            starting_surface = self.render_text(self.font, "Starting heart rate detector...", self.text_color)
+            starting_rect = starting_surface.get_rect(center=(surface.get_width() // 2, 400))
+            self.mark_dirty(surface.blit(starting_surface, starting_rect))
+        elif self.measurement_started:
             roi = status['roi']
             if roi:
-                x, y, w, h = roi
-                pygame.draw.rect(surface, (0, 255, 0), (x, y, w, h), 2)
+                x, y, w, h = self.kinect_manager.preview_rect_to_display(roi)
+                self.mark_dirty(pygame.draw.rect(surface, (0, 255, 0), (x, y, w, h), 2))
                 
-                roi_label = self.small_font.render("Forehead Detection", True, (0, 255, 0))
-                surface.blit(roi_label, (x, y - 25))
+                roi_label = self.render_text(self.small_font, "Forehead Detection", (0, 255, 0))
+                self.mark_dirty(surface.blit(roi_label, (x, y - 25)))
             
             if status['is_counting_down']:
                 countdown_remaining = status['countdown_remaining']
                 if countdown_remaining > 0:
                     countdown_text = "Get ready! Starting in: {:.0f}".format(countdown_remaining)
-                    countdown_surface = self.title_font.render(countdown_text, True, (255, 255, 0))
+                    countdown_surface = self.render_text(self.title_font, countdown_text, (255, 255, 0))
                     countdown_rect = countdown_surface.get_rect(center=(surface.get_width() // 2, 400))
-                    surface.blit(countdown_surface, countdown_rect)
+                    self.mark_dirty(surface.blit(countdown_surface, countdown_rect))
                     
                     instructions_text = "Position yourself in front of the camera"
-                    inst_surface = self.font.render(instructions_text, True, self.text_color)
+                    inst_surface = self.render_text(self.font, instructions_text, self.text_color)
                     inst_rect = inst_surface.get_rect(center=(surface.get_width() // 2, 500))
-                    surface.blit(inst_surface, inst_rect)
+                    self.mark_dirty(surface.blit(inst_surface, inst_rect))
                 else:
                     start_text = "Starting measurement now!"
-                    start_surface = self.title_font.render(start_text, True, (0, 255, 0))
+                    start_surface = self.render_text(self.title_font, start_text, (0, 255, 0))
                     start_rect = start_surface.get_rect(center=(surface.get_width() // 2, 400))
-                    surface.blit(start_surface, start_rect)
+                    self.mark_dirty(surface.blit(start_surface, start_rect))
             else:
                 y_pos = 200
                 
                 time_text = "Time: {:.1f}s / {}s".format(status['elapsed_time'], status['recording_time'])
-                time_surface = self.font.render(time_text, True, self.text_color)
-                surface.blit(time_surface, (50, y_pos))
+                time_surface = self.render_text(self.font, time_text, self.text_color)
+                self.mark_dirty(surface.blit(time_surface, (50, y_pos)))
                 y_pos += 50
                 
                 progress = min(status['elapsed_time'] / status['recording_time'], 1.0)
@@ -133,16 +168,25 @@ class HeartRateMonitor(BaseMenu):
                 bar_x = 50
                 bar_y = y_pos
                 
-                pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
-                pygame.draw.rect(surface, (0, 255, 0), (bar_x, bar_y, int(bar_width * progress), bar_height))
-                pygame.draw.rect(surface, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 2)
+                self.mark_dirty(pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height)))
+                self.mark_dirty(pygame.draw.rect(surface, (0, 255, 0), (bar_x, bar_y, int(bar_width * progress), bar_height)))
+                self.mark_dirty(pygame.draw.rect(surface, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 2))
                 y_pos += 50
                 
                 samples_text = "Samples: {}".format(status['samples_collected'])
-                samples_surface = self.font.render(samples_text, True, self.text_color)
-                surface.blit(samples_surface, (50, y_pos))
+                samples_surface = self.render_text(self.font, samples_text, self.text_color)
+                self.mark_dirty(surface.blit(samples_surface, (50, y_pos)))
                 y_pos += 40
                 
+                if status['detection_mode']:
+                    detection_text = "Face search: {} ({:.1f} ms, frame {:.1f} ms)".format(
+                        status['detection_mode'], status['detection_ms'], status['frame_ms'])
+                    if 'frames_dropped' in status:
+                        detection_text += ", {} skipped".format(status['frames_dropped'])
+                    detection_surface = self.render_text(self.small_font, detection_text, self.text_color)
+                    self.mark_dirty(surface.blit(detection_surface, (50, y_pos)))
+                    y_pos += 30
+                
                 quality = status['signal_quality']
                 if quality == "GOOD":
                     quality_color = (0, 255, 0)
@@ -152,26 +196,31 @@ class HeartRateMonitor(BaseMenu):
                     quality_color = (255, 0, 0)
                     
                 quality_text = "Signal Quality: {}".format(quality)
-                quality_surface = self.font.render(quality_text, True, quality_color)
-                surface.blit(quality_surface, (50, y_pos))
+                quality_surface = self.render_text(self.font, quality_text, quality_color)
+                self.mark_dirty(surface.blit(quality_surface, (50, y_pos)))
                 y_pos += 60
                 
                 if status['processing_done']:
-                    result_surface = self.font.render(status['final_hr_text'], True, (0, 255, 255))
+                    result_surface = self.render_text(self.font, status['final_hr_text'], (0, 255, 255))
                     result_rect = result_surface.get_rect(center=(surface.get_width() // 2, y_pos))
-                    surface.blit(result_surface, result_rect)
+                    self.mark_dirty(surface.blit(result_surface, result_rect))
                     
                     complete_text = "Measurement Complete! You can restart or go back."
-                    complete_surface = self.small_font.render(complete_text, True, (255, 255, 255))
+                    complete_surface = self.render_text(self.small_font, complete_text, (255, 255, 255))
                     complete_rect = complete_surface.get_rect(center=(surface.get_width() // 2, y_pos + 50))
-                    surface.blit(complete_surface, complete_rect)
-                elif status['is_recording']:
+                    self.mark_dirty(surface.blit(complete_surface, complete_rect))
+                elif status['live_bpm'] is not None:
+                    live_text = "Live estimate: {:.0f} BPM".format(status['live_bpm'])
+                    if status['live_stable']:
+                        live_text += " (stable)"
+                    live_surface = self.render_text(self.font, live_text, (0, 255, 255))
+                    live_rect = live_surface.get_rect(center=(surface.get_width() // 2, y_pos))
+                    self.mark_dirty(surface.blit(live_surface, live_rect))
+                
+                if not status['processing_done'] and status['is_recording']:
                     recording_text = "Recording... Stay still and look at the camera"
-                    recording_surface = self.small_font.render(recording_text, True, (255, 255, 0))
+                    recording_surface = self.render_text(self.small_font, recording_text, (255, 255, 0))
                     recording_rect = recording_surface.get_rect(center=(surface.get_width() // 2, 840))
-                    surface.blit(recording_surface, recording_rect)
+                    self.mark_dirty(surface.blit(recording_surface, recording_rect))
         
-        for button in self.buttons:
-            button.draw(surface)
-            
         self.draw_hold_indicator(surface)
\ No newline at end of file
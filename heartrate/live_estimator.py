@@ -0,0 +1,126 @@
+import numpy as np
+from scipy import signal as scipy_signal
+from heartrate.rppg import normalize_channels, pos_pulse, chrom_pulse
+
+class LiveHeartRateEstimator:
+    """Heart rate from a sliding window of PPG samples, cheap enough to run every second.
+
+    The band-pass filter and frequency mask depend only on the snapped
+    sample rate and the Hann window only on the window length, so each is
+    designed once and reused. The spectrum is a zero-padded real FFT with parabolic peak
+    interpolation, giving sub-BPM resolution from a short window.
+
+    estimate_rgb() takes the (3, N) R, G, B trace as one array and combines
+    the channels into a single pulse signal (POS, CHROM or plain green)
+    before the spectrum is taken.
+    """
+
+    def __init__(self, min_hr=50, max_hr=180, lowcut=0.8, highcut=3.0, order=4, nfft=2048,
+                 method="pos", pos_window=1.6):
+        self.min_hr = min_hr
+        self.max_hr = max_hr
+        self.lowcut = lowcut
+        self.highcut = highcut
+        self.order = order
+        self.nfft = nfft
+        self.method = method
+        self.pos_window = pos_window
+        self._designs = {}
+        self._windows = {}
+
+    def _design(self, fs, nfft):
+        """(sos, freqs, band) for a snapped sample rate; nfft only grows past self.nfft for long traces."""
+        key = (fs, nfft)
+        design = self._designs.get(key)
+        if design is None:
+            nyquist = 0.5 * fs
+            sos = None
+            if self.highcut < nyquist:
+                sos = scipy_signal.butter(self.order, [self.lowcut / nyquist, self.highcut / nyquist],
+                                          btype='band', output='sos')
+            freqs = np.fft.rfftfreq(nfft, 1.0 / fs)
+            band = np.flatnonzero((freqs >= self.min_hr / 60.0) & (freqs <= self.max_hr / 60.0))
+            design = (sos, freqs, band)
+            if len(self._designs) >= 32:
+                self._designs.clear()
+            self._designs[key] = design
+        return design
+
+    def _window(self, length):
+        window = self._windows.get(length)
+        if window is None:
+            window = np.hanning(length)
+            if len(self._windows) >= 32:
+                self._windows.clear()
+            self._windows[length] = window
+        return window
+
+    def snap(self, fs):
+        """Measured rates jitter; snap them so filter designs and window lengths can be reused."""
+        return max(0.5, round(fs * 2) / 2.0)
+
+    def _bandpass(self, sos, data):
+        if sos is None:
+            return data
+        try:
+            return scipy_signal.sosfiltfilt(sos, data, axis=-1)
+        except ValueError:
+            # Too few samples for the filter's padding
+            return None
+
+    def _peak(self, filtered, design, nfft):
+        """(BPM, SNR in dB) of the strongest in-band peak of a filtered 1-D signal."""
+        sos, freqs, band = design
+        power = np.abs(np.fft.rfft(filtered * self._window(len(filtered)), nfft)) ** 2
+        peak = band[np.argmax(power[band])]
+        offset = 0.0
+        if band[0] < peak < band[-1]:
+            left, center, right = np.sqrt(power[peak - 1:peak + 2])
+            denominator = left - 2 * center + right
+            if denominator != 0:
+                offset = 0.5 * (left - right) / denominator
+        frequency = freqs[peak] + offset * (freqs[1] - freqs[0])
+
+        # Power around the fundamental and first harmonic against the rest of the pass band
+        in_band = (freqs >= self.lowcut) & (freqs <= self.highcut)
+        near = (np.abs(freqs - frequency) <= 0.1) | (np.abs(freqs - 2 * frequency) <= 0.2)
+        signal_power = power[in_band & near].sum()
+        noise_power = power[in_band & ~near].sum()
+        snr = 10 * np.log10(signal_power / noise_power) if signal_power > 0 and noise_power > 0 else 0.0
+
+        heart_rate = float(frequency * 60.0)
+        if not self.min_hr <= heart_rate <= self.max_hr:
+            return None, snr
+        return heart_rate, float(snr)
+
+    def estimate_rgb(self, rgb, fs, method=None):
+        """(BPM, SNR in dB) of a (3, N) R, G, B trace, or (None, None) if there is no usable peak."""
+        method = method or self.method
+        length = rgb.shape[1]
+        if length < 2 or fs <= 0:
+            return None, None
+        fs = self.snap(fs)
+        nfft = max(self.nfft, 1 << int(np.ceil(np.log2(length))))
+        design = self._design(fs, nfft)
+        if len(design[2]) < 3:
+            return None, None
+
+        if method == "pos":
+            pulse = pos_pulse(rgb, int(self.pos_window * fs))
+            if pulse is not None:
+                pulse = self._bandpass(design[0], pulse)
+        else:
+            normalized = normalize_channels(rgb)
+            if normalized is None:
+                return None, None
+            if method == "chrom":
+                # Filtering is linear, so all three channels go through one call
+                filtered = self._bandpass(design[0], normalized)
+                pulse = None if filtered is None else chrom_pulse(filtered)
+            elif method == "green":
+                pulse = self._bandpass(design[0], normalized[1])
+            else:
+                raise ValueError("Unknown rPPG method: {}".format(method))
+        if pulse is None or np.std(pulse) == 0:
+            return None, None
+        return self._peak(pulse, design, nfft)
@@ -0,0 +1,51 @@
+import numpy as np
+
+# Projection of the temporally normalized R, G, B traces onto the plane
+# orthogonal to skin tone (Wang et al., "Algorithmic Principles of Remote
+# PPG", 2017)
+POS_PROJECTION = np.array([[0.0, 1.0, -1.0],
+                           [-2.0, 1.0, 1.0]])
+
+RPPG_METHODS = ("pos", "chrom", "green")
+
+def normalize_channels(rgb):
+    """Each row of a (channels, N) trace divided by its mean, minus one, or None for a dark trace."""
+    means = rgb.mean(axis=1, keepdims=True)
+    if np.any(means <= 0):
+        return None
+    return rgb / means - 1.0
+
+def pos_pulse(rgb, window):
+    """POS pulse signal of a (3, N) R, G, B trace, overlap-added from windows of window samples.
+
+    All windows are projected at once through a strided view of the trace.
+    """
+    count = rgb.shape[1]
+    window = max(2, min(window, count))
+    starts = count - window + 1
+    stride_channel, stride_sample = rgb.strides
+    windows = np.lib.stride_tricks.as_strided(
+        rgb, shape=(starts, 3, window), strides=(stride_sample, stride_channel, stride_sample), writeable=False)
+    means = windows.mean(axis=2, keepdims=True)
+    if np.any(means <= 0):
+        return None
+    projected = np.einsum('ij,kjl->kil', POS_PROJECTION, windows / means)
+    spread = projected.std(axis=2)
+    alpha = np.divide(spread[:, 0], spread[:, 1], out=np.zeros(starts), where=spread[:, 1] > 0)
+    pulses = projected[:, 0] + alpha[:, None] * projected[:, 1]
+    pulses -= pulses.mean(axis=1, keepdims=True)
+
+    signal = np.zeros(count)
+    for offset in range(window):
+        signal[offset:offset + starts] += pulses[:, offset]
+    return signal
+
+def chrom_pulse(filtered):
+    """CHROM pulse signal (de Haan and Jeanne, 2013) from band-passed, normalized R, G, B traces."""
+    red, green, blue = filtered
+    x = 3.0 * red - 2.0 * green
+    y = 1.5 * red + green - 1.5 * blue
+    std_y = np.std(y)
+    if std_y == 0:
+        return x
+    return x - (np.std(x) / std_y) * y
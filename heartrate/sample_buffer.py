@@ -0,0 +1,40 @@
+import numpy as np
+
+class SampleRingBuffer:
+    """Fixed-capacity ring buffer of multi-channel samples, preallocated as one float array.
+
+    Every sample is written twice, at its slot and one capacity further on,
+    so the newest n samples are always a contiguous slice and last(n) is a
+    zero-copy (channels, n) view. Views are read-only and only valid until
+    the buffer wraps past them.
+    """
+
+    def __init__(self, channels, capacity, dtype=np.float64):
+        self.channels = channels
+        self.capacity = max(1, capacity)
+        self._data = np.zeros((channels, 2 * self.capacity), dtype=dtype)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, values):
+        self._data[:, self._next] = values
+        self._data[:, self._next + self.capacity] = values
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def last(self, n=None):
+        """View of the newest n samples (all of them by default), oldest first."""
+        if n is None or n > self._count:
+            n = self._count
+        end = self._next + self.capacity
+        view = self._data[:, end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
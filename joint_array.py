@@ -0,0 +1,61 @@
+import ctypes
+from collections import namedtuple
+
+import numpy as np
+
+from kinect_compat import PyKinectV2
+
+# Column layout of the last axis of a joint array
+X, Y, Z, STATE = 0, 1, 2, 3
+JOINT_COUNT = PyKinectV2.JointType_Count
+
+# One body frame as arrays:
+#   joints        float32 (bodies, JOINT_COUNT, 4) camera-space x, y, z and tracking state
+#   tracked       bool    (bodies,) which body slots hold a tracked person
+#   tracking_ids  uint64  (bodies,) sensor tracking id of each body slot
+#   frame         the source body frame, kept for the coordinate mapper
+BodyArrays = namedtuple("BodyArrays", ["joints", "tracked", "tracking_ids", "frame"])
+
+# Memory layout of PyKinect2's _Joint struct, so a body's joints can be read
+# in one copy instead of one ctypes attribute lookup per value.
+JOINT_DTYPE = np.dtype([
+    ("JointType", np.int32),
+    ("Position", [("x", np.float32), ("y", np.float32), ("z", np.float32)]),
+    ("TrackingState", np.int32),
+])
+
+def _read_joints(joints, out):
+    if isinstance(joints, ctypes._Pointer) and ctypes.sizeof(joints._type_) == JOINT_DTYPE.itemsize:
+        raw = np.frombuffer(
+            (ctypes.c_char * (JOINT_DTYPE.itemsize * JOINT_COUNT)).from_address(ctypes.addressof(joints.contents)),
+            dtype=JOINT_DTYPE)
+        out[:, X] = raw["Position"]["x"]
+        out[:, Y] = raw["Position"]["y"]
+        out[:, Z] = raw["Position"]["z"]
+        out[:, STATE] = raw["TrackingState"]
+        return
+    for j in range(JOINT_COUNT):
+        joint = joints[j]
+        out[j] = (joint.Position.x, joint.Position.y, joint.Position.z, joint.TrackingState)
+
+def body_frame_to_arrays(body_frame, max_body_count):
+    """Convert a body frame into BodyArrays. Frames that already carry arrays are passed through."""
+    arrays = getattr(body_frame, "body_arrays", None)
+    if arrays is not None:
+        return arrays
+    joints = np.zeros((max_body_count, JOINT_COUNT, 4), dtype=np.float32)
+    tracked = np.zeros(max_body_count, dtype=bool)
+    tracking_ids = np.zeros(max_body_count, dtype=np.uint64)
+    for i in range(max_body_count):
+        body = body_frame.bodies[i]
+        if not body.is_tracked:
+            continue
+        tracked[i] = True
+        tracking_ids[i] = body.tracking_id
+        _read_joints(body.joints, joints[i])
+    joints.flags.writeable = False
+    return BodyArrays(joints, tracked, tracking_ids, body_frame)
+
+def joints_tracked(joints, joint_types):
+    """True where every listed joint is fully tracked. Works on (..., JOINT_COUNT, 4) arrays."""
+    return np.all(joints[..., joint_types, STATE] == PyKinectV2.TrackingState_Tracked, axis=-1)
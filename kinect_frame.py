@@ -0,0 +1,24 @@
+from collections import namedtuple
+
+# One immutable view of the sensor state for a single app loop iteration.
+# color_surface/bodies always hold the most recent frames seen so far, the
+# has_new_* flags tell consumers whether they arrived during this tick.
+# *_seq and *_timestamp identify the frames in the capture ring buffers.
+# color_surface is the converter's reusable surface; it is only rewritten when
+# a newer color frame is published, i.e. between ticks. color_frame is the
+# same frame as the raw (height, width, 4) BGRA preview array it was copied
+# from; it is never written to again and may be read without copying.
+FrameSnapshot = namedtuple("FrameSnapshot", [
+    "tick",
+    "color_surface",
+    "color_frame",
+    "bodies",
+    "has_new_color",
+    "has_new_bodies",
+    "color_seq",
+    "body_seq",
+    "color_timestamp",
+    "body_timestamp",
+])
+
+EMPTY_SNAPSHOT = FrameSnapshot(0, None, None, None, False, False, 0, 0, None, None)
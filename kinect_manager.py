@@ -1,27 +1,227 @@
-import pygame
+import threading
+import cv2
 import numpy as np
-from pykinect2 import PyKinectV2, PyKinectRuntime
+import pygame
+from kinect_frame import FrameSnapshot, EMPTY_SNAPSHOT
+from frame_buffer import FrameRingBuffer
+from joint_array import body_frame_to_arrays
+from color_frame import ColorFrameConverter, KINECT_COLOR_SIZE, preview_size_from_config, display_size_from_config
 
 class KinectManager:
-    def __init__(self):
-        self.kinect = PyKinectRuntime.PyKinectRuntime(
-            PyKinectV2.FrameSourceTypes_Color | PyKinectV2.FrameSourceTypes_Body
-        )
+    def __init__(self, config=None, runtime=None):
+        if config is None:
+            config = {}
+        if runtime is None:
+            from pykinect2 import PyKinectV2, PyKinectRuntime
+            runtime = PyKinectRuntime.PyKinectRuntime(
+                PyKinectV2.FrameSourceTypes_Color | PyKinectV2.FrameSourceTypes_Body
+            )
+        self.kinect = runtime
+        self.max_body_count = self.kinect.max_body_count
         self.width = self.kinect.color_frame_desc.Width
         self.height = self.kinect.color_frame_desc.Height
 
-    def get_color_frame(self):
+        # Everything downstream (background, blur, skeleton, hand cursor, heart
+        # rate) works in preview space; frames are downscaled once on capture.
+        # The coordinate mapper always reports native color camera pixels.
+        self.preview_width, self.preview_height = preview_size_from_config(config)
+        self.preview_scale = np.array([self.preview_width / float(KINECT_COLOR_SIZE[0]),
+                                       self.preview_height / float(KINECT_COLOR_SIZE[1])], dtype=np.float32)
+        self.color_converter = ColorFrameConverter(self.preview_width, self.preview_height)
+
+        # Menus lay out and draw in window (display) space; preview-space
+        # frames and joints are scaled up only where they are shown.
+        self.display_width, self.display_height = display_size_from_config(config)
+        self.display_scale = np.array([self.display_width / float(self.preview_width),
+                                       self.display_height / float(self.preview_height)], dtype=np.float32)
+        self._display_surface = None
+
+        capture_cfg = config.get("capture", {})
+        self.threaded = capture_cfg.get("threaded", True)
+        self.idle_sleep = capture_cfg.get("idle_sleep", 0.002)
+        self.color_frames = FrameRingBuffer(capture_cfg.get("color_buffer_size", 3))
+        self.body_frames = FrameRingBuffer(capture_cfg.get("body_buffer_size", 8))
+
+        self.snapshot = EMPTY_SNAPSHOT
+        self._color_points_frame = None
+        self._color_points_cache = {}
+        self._screen_points_cache = {}
+
+        self.recorder = None
+        self._recorder_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._capture_thread = None
+        if self.threaded:
+            self._capture_thread = threading.Thread(target=self._capture_loop, name="KinectCapture")
+            self._capture_thread.daemon = True
+            self._capture_thread.start()
+
+    def _prepare_color_frame(self, frame):
+        frame = frame.reshape((self.height, self.width, 4))  # BGRA
+        if (self.preview_width, self.preview_height) != (self.width, self.height):
+            frame = cv2.resize(frame, (self.preview_width, self.preview_height), interpolation=cv2.INTER_AREA)
+        # Shared read-only with every consumer of the snapshot
+        frame.flags.writeable = False
+        return frame
+
+    def _capture_once(self):
+        """Move any frames the sensor has published into the ring buffers."""
+        captured = False
         if self.kinect.has_new_color_frame():
-            frame = self.kinect.get_last_color_frame()
-            frame = frame.reshape((self.height, self.width, 4))  # BGRA
-            frame_rgb = frame[:, :, :3][:, :, ::-1]  # to RGB
-            return pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-        return None
+            frame = self.color_frames.push(self._prepare_color_frame(self.kinect.get_last_color_frame()))
+            with self._recorder_lock:
+                if self.recorder is not None:
+                    self.recorder.add_color_frame(frame.timestamp, frame.data)
+            captured = True
+        if self.kinect.has_new_body_frame():
+            bodies = body_frame_to_arrays(self.kinect.get_last_body_frame(), self.max_body_count)
+            frame = self.body_frames.push(bodies)
+            with self._recorder_lock:
+                if self.recorder is not None:
+                    self.recorder.add_body_frame(frame.timestamp, bodies, self._map_bodies_to_color(bodies))
+            captured = True
+        return captured
+
+    def _capture_loop(self):
+        while not self._stop_event.is_set():
+            if not self._capture_once():
+                self._stop_event.wait(self.idle_sleep)
+
+    def poll(self):
+        """Take the latest buffered frames once per loop iteration and publish a snapshot.
+
+        Never blocks on the sensor: when the capture thread has nothing new the
+        previous frames are carried over with the has_new_* flags cleared.
+        """
+        if not self.threaded:
+            self._capture_once()
+
+        previous = self.snapshot
+        color_surface = previous.color_surface
+        color_frame = previous.color_frame
+        color_seq = previous.color_seq
+        color_timestamp = previous.color_timestamp
+        bodies = previous.bodies
+        body_seq = previous.body_seq
+        body_timestamp = previous.body_timestamp
+
+        latest_color = self.color_frames.latest()
+        has_new_color = latest_color is not None and latest_color.seq != previous.color_seq
+        if has_new_color:
+            color_surface = self.color_converter.convert(latest_color.data)
+            color_frame = latest_color.data
+            color_seq = latest_color.seq
+            color_timestamp = latest_color.timestamp
+
+        latest_body = self.body_frames.latest()
+        has_new_bodies = latest_body is not None and latest_body.seq != previous.body_seq
+        if has_new_bodies:
+            bodies = latest_body.data
+            body_seq = latest_body.seq
+            body_timestamp = latest_body.timestamp
+
+        self.snapshot = FrameSnapshot(
+            tick=previous.tick + 1,
+            color_surface=color_surface,
+            color_frame=color_frame,
+            bodies=bodies,
+            has_new_color=has_new_color,
+            has_new_bodies=has_new_bodies,
+            color_seq=color_seq,
+            body_seq=body_seq,
+            color_timestamp=color_timestamp,
+            body_timestamp=body_timestamp,
+        )
+        return self.snapshot
+
+    def get_snapshot(self):
+        return self.snapshot
+
+    def get_color_frame(self):
+        return self.snapshot.color_surface
 
     def get_bodies(self):
-        if self.kinect.has_new_body_frame():
-            return self.kinect.get_last_body_frame()
-        return None
+        return self.snapshot.bodies
+
+    def _map_body_to_color(self, bodies, index):
+        joint_points = self.kinect.body_joints_to_color_space(bodies.frame.bodies[index].joints)
+        return np.array([(point.x, point.y) for point in joint_points], dtype=np.float32)
+
+    def _map_bodies_to_color(self, bodies):
+        points = np.full(bodies.joints.shape[:2] + (2,), np.inf, dtype=np.float32)
+        for index in np.flatnonzero(bodies.tracked):
+            points[index] = self._map_body_to_color(bodies, index)
+        return points
+
+    def body_color_points(self, bodies, index):
+        """Preview-space pixel positions of all joints of body slot index, as a read-only (JointType_Count, 2) array.
+
+        Each body is sent through the coordinate mapper once per body frame and
+        the result is shared by every caller. Joints the mapper cannot place
+        (reported as inf) are masked out as NaN.
+        """
+        if bodies is not self._color_points_frame:
+            self._color_points_frame = bodies
+            self._color_points_cache = {}
+            self._screen_points_cache = {}
+        points = self._color_points_cache.get(index)
+        if points is None:
+            points = self._map_body_to_color(bodies, index) * self.preview_scale
+            points[np.isinf(points).any(axis=1)] = np.nan
+            points.flags.writeable = False
+            self._color_points_cache[index] = points
+        return points
+
+    def body_screen_points(self, bodies, index):
+        """Window-space pixel positions of all joints of body slot index, for hit-testing and overlays."""
+        points = self.body_color_points(bodies, index)
+        if (self.display_width, self.display_height) == (self.preview_width, self.preview_height):
+            return points
+        screen_points = self._screen_points_cache.get(index)
+        if screen_points is None:
+            screen_points = points * self.display_scale
+            screen_points.flags.writeable = False
+            self._screen_points_cache[index] = screen_points
+        return screen_points
+
+    def preview_rect_to_display(self, rect):
+        """Scale an (x, y, w, h) rectangle in preview pixels to window pixels."""
+        scale_x, scale_y = self.display_scale
+        x, y, w, h = rect
+        return (int(x * scale_x), int(y * scale_y), int(w * scale_x), int(h * scale_y))
+
+    def scale_to_display(self, surface, size):
+        """Scale a preview-sized surface to size into one reused surface, shared by every menu."""
+        if surface.get_size() == size:
+            return surface
+        if self._display_surface is None or self._display_surface.get_size() != size:
+            self._display_surface = pygame.Surface(size, 0, surface)
+        return pygame.transform.scale(surface, size, self._display_surface)
+
+    def body_frames_since(self, seq):
+        """Every captured body frame newer than seq, up to the latest published snapshot."""
+        return [frame for frame in self.body_frames.frames_since(seq) if frame.seq <= self.snapshot.body_seq]
+
+    def start_recording(self, path, include_color=True):
+        """Write every captured frame to a recording directory that ReplayKinectManager can play back."""
+        from replay import KinectRecorder
+        recorder = KinectRecorder(path, self.max_body_count, include_color=include_color)
+        with self._recorder_lock:
+            previous, self.recorder = self.recorder, recorder
+        if previous is not None:
+            previous.close()
+        return recorder
+
+    def stop_recording(self):
+        with self._recorder_lock:
+            recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
 
     def close(self):
+        self._stop_event.set()
+        if self._capture_thread is not None:
+            self._capture_thread.join(1.0)
+        self.stop_recording()
         self.kinect.close()
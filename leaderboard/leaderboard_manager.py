@@ -6,6 +6,8 @@ class LeaderboardManager:
     def __init__(self, data_file="leaderboard_data.json"):
         self.data_file = data_file
         self.data = self.load_data()
+        # Bumped whenever data changes, so views can cache what they render from it
+        self.revision = 0
         
     def load_data(self):
         if os.path.exists(self.data_file):
@@ -89,7 +91,7 @@ class LeaderboardManager:
         form_score = max(0, min(100, 100 - (form_penalties / max_penalties * 100)))
         return round(form_score, 1)
     
-    def record_session(self, exercise_type, reps, exercise_detector):
+    def record_session(self, exercise_type, reps, exercise_detector, save=True):
         if exercise_type not in self.data["exercises"]:
             return False
             
@@ -133,7 +135,9 @@ class LeaderboardManager:
                 sum(all_form_scores) / len(all_form_scores), 1
             )
         
-        self.save_data()
+        self.revision += 1
+        if save:
+            self.save_data()
         return True
     
     def get_form_quality_text(self, score):
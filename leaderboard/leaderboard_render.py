@@ -1,13 +1,16 @@
 import pygame
+import time
 from gui.base_menu import BaseMenu
 from button import Button
 from leaderboard.leaderboard_manager import LeaderboardManager
 
 class LeaderboardRender(BaseMenu):
-    def __init__(self, kinect_manager, config):
-        super().__init__(kinect_manager, config)
+    def __init__(self, kinect_manager, config, leaderboard=None, blur_effect=None):
+        super().__init__(kinect_manager, config, blur_effect)
         
-        self.leaderboard = LeaderboardManager()
+        if leaderboard is None:
+            leaderboard = LeaderboardManager()
+        self.leaderboard = leaderboard
         
         colors_cfg = config.get("colors", {})
         buttons_cfg = config.get("buttons", {})
@@ -33,29 +36,88 @@ class LeaderboardRender(BaseMenu):
         
         self.buttons = [self.back_button]
         
+        leaderboard_cfg = config.get("leaderboard", {})
+        # Records scroll while the hand rests in the top or bottom scroll_zone
+        # fraction of the visible area, faster the closer it is to the edge.
+        self.scroll_speed = leaderboard_cfg.get("scroll_speed", 600)
+        self.scroll_zone = leaderboard_cfg.get("scroll_zone", 0.2)
+        self.records_top = 150
+        self.records_bottom_margin = 40
+        
+        # The records page is rendered once into records_canvas and rebuilt
+        # only when the leaderboard revision changes; scrolling moves the
+        # window draw_dynamic blits from it, so the static layer is kept.
+        self.records_canvas = None
+        self.records_revision = None
         self.scroll_offset = 0
         self.max_scroll = 0
+        self.records_changed = False
+        self.last_update_time = None
+        
+    def on_enter(self):
+        super().on_enter()
+        self.scroll_offset = 0
+        self.last_update_time = None
         
     def update(self, surface):
         hand_pos = self.get_hand_position()
-        return self.handle_button_interaction(hand_pos)
+        action = self.handle_button_interaction(hand_pos)
+        
+        if self.records_revision != self.leaderboard.revision:
+            self.records_canvas = None
+            self.records_changed = True
+        
+        now = time.time()
+        elapsed = now - self.last_update_time if self.last_update_time is not None else 0
+        self.last_update_time = now
+        if self.scroll_by_hand(hand_pos, self.get_records_view(surface), elapsed):
+            self.records_changed = True
+        return action
+    
+    def needs_redraw(self, snapshot):
+        return self.records_changed or super().needs_redraw(snapshot)
     
-    def draw(self, surface):
-        self.draw_background(surface)
+    def get_records_view(self, surface):
+        height = surface.get_height() - self.records_top - self.records_bottom_margin
+        return pygame.Rect(0, self.records_top, surface.get_width(), max(height, 0))
+    
+    def scroll_by_hand(self, hand_pos, view, elapsed):
+        """Scroll towards the edge the hand rests near. Returns True if the visible part changed."""
+        if not hand_pos or self.max_scroll <= 0 or self.holding_button or not view.collidepoint(hand_pos):
+            return False
+        zone = view.height * self.scroll_zone
+        if zone <= 0:
+            return False
+        hand_y = hand_pos[1]
+        if hand_y < view.top + zone:
+            direction = -(view.top + zone - hand_y) / zone
+        elif hand_y > view.bottom - zone:
+            direction = (hand_y - (view.bottom - zone)) / zone
+        else:
+            return False
         
-        title_surface = self.title_font.render("Personal Records", True, self.text_color)
-        title_rect = title_surface.get_rect(center=(surface.get_width() // 2, 80))
-        surface.blit(title_surface, title_rect)
+        previous = int(self.scroll_offset)
+        self.scroll_offset += direction * self.scroll_speed * elapsed
+        self.scroll_offset = min(max(self.scroll_offset, 0), self.max_scroll)
+        return int(self.scroll_offset) != previous
+    
+    def layout_records(self, width):
+        """Rendered lines of the records page as (surface, (x, y)) in page coordinates, and the page height."""
+        items = []
+        y_pos = 0
         
-        y_pos = 150 - self.scroll_offset
+        def add_line(font, text, color, x, advance):
+            items.append((self.render_text(font, text, color), (x, y_pos)))
+            return y_pos + advance
+        
+        def add_centered(font, text, color, center_y):
+            text_surface = self.render_text(font, text, color)
+            items.append((text_surface, text_surface.get_rect(center=(width // 2, center_y)).topleft))
         
         overall_stats = self.leaderboard.get_overall_stats()
         
         if overall_stats["total_workouts"] > 0:
-            overall_text = "Overall Stats"
-            overall_surface = self.font.render(overall_text, True, (255, 215, 0))
-            surface.blit(overall_surface, (50, y_pos))
-            y_pos += 50
+            y_pos = add_line(self.font, "Overall Stats", (255, 215, 0), 50, 50)
             
             stats_lines = [
                 "Total Workouts: {}".format(overall_stats['total_workouts']),
@@ -64,9 +126,7 @@ class LeaderboardRender(BaseMenu):
             ]
             
             for line in stats_lines:
-                line_surface = self.small_font.render(line, True, self.text_color)
-                surface.blit(line_surface, (70, y_pos))
-                y_pos += 30
+                y_pos = add_line(self.small_font, line, self.text_color, 70, 30)
             
             y_pos += 20
             
@@ -77,50 +137,56 @@ class LeaderboardRender(BaseMenu):
                 stats = self.leaderboard.get_exercise_stats(exercise_type)
                 
                 if stats and stats["total_sessions"] > 0:
-                    exercise_title = "{} Records".format(display_name)
-                    title_surface = self.font.render(exercise_title, True, (100, 200, 255))
-                    surface.blit(title_surface, (50, y_pos))
-                    y_pos += 40
+                    y_pos = add_line(self.font, "{} Records".format(display_name), (100, 200, 255), 50, 40)
                     
                     if stats["best_reps"] > 0:
                         best_text = "Personal Best: {} reps".format(stats['best_reps'])
-                        best_surface = self.small_font.render(best_text, True, (0, 255, 0))
-                        surface.blit(best_surface, (70, y_pos))
-                        y_pos += 25
+                        y_pos = add_line(self.small_font, best_text, (0, 255, 0), 70, 25)
                         
                         form_text = "Best Session Form: {}% ({})".format(stats['best_form_score'], self.leaderboard.get_form_quality_text(stats['best_form_score']))
-                        form_color = self.get_form_color(stats['best_form_score'])
-                        form_surface = self.small_font.render(form_text, True, form_color)
-                        surface.blit(form_surface, (70, y_pos))
-                        y_pos += 25
+                        y_pos = add_line(self.small_font, form_text, self.get_form_color(stats['best_form_score']), 70, 25)
                     
                     lifetime_text = "Total: {} reps in {} sessions".format(stats['total_reps'], stats['total_sessions'])
-                    lifetime_surface = self.small_font.render(lifetime_text, True, self.text_color)
-                    surface.blit(lifetime_surface, (70, y_pos))
-                    y_pos += 25
+                    y_pos = add_line(self.small_font, lifetime_text, self.text_color, 70, 25)
                     
                     avg_form_text = "Average Form: {}% ({})".format(stats['avg_form_score'], self.leaderboard.get_form_quality_text(stats['avg_form_score']))
-                    avg_form_color = self.get_form_color(stats['avg_form_score'])
-                    avg_form_surface = self.small_font.render(avg_form_text, True, avg_form_color)
-                    surface.blit(avg_form_surface, (70, y_pos))
-                    y_pos += 25
+                    y_pos = add_line(self.small_font, avg_form_text, self.get_form_color(stats['avg_form_score']), 70, 25)
                     
                     consistency_text = "Consistency: {}% good form sessions".format(stats['consistency_percent'])
-                    consistency_surface = self.small_font.render(consistency_text, True, self.text_color)
-                    surface.blit(consistency_surface, (70, y_pos))
-                    y_pos += 35
+                    y_pos = add_line(self.small_font, consistency_text, self.text_color, 70, 35)
         else:
-            no_data_text = "No workout data yet!"
-            no_data_surface = self.font.render(no_data_text, True, self.text_color)
-            no_data_rect = no_data_surface.get_rect(center=(surface.get_width() // 2, 300))
-            surface.blit(no_data_surface, no_data_rect)
-            
-            instruction_text = "Complete some exercises to see your personal records here."
-            instruction_surface = self.small_font.render(instruction_text, True, self.text_color)
-            instruction_rect = instruction_surface.get_rect(center=(surface.get_width() // 2, 350))
-            surface.blit(instruction_surface, instruction_rect)
+            add_centered(self.font, "No workout data yet!", self.text_color, 150)
+            add_centered(self.small_font, "Complete some exercises to see your personal records here.", self.text_color, 200)
+            y_pos = 250
+        
+        return items, y_pos
+    
+    def build_records_canvas(self, width):
+        items, height = self.layout_records(width)
+        canvas = pygame.Surface((width, max(height, 1)), pygame.SRCALPHA)
+        canvas.blits(items, doreturn=False)
+        return canvas
+    
+    def draw_static(self, surface):
+        title_surface = self.render_text(self.title_font, "Personal Records", self.text_color)
+        title_rect = title_surface.get_rect(center=(surface.get_width() // 2, 80))
+        surface.blit(title_surface, title_rect)
         
         self.back_button.draw(surface)
+    
+    def draw_dynamic(self, surface):
+        if self.records_canvas is None or self.records_canvas.get_width() != surface.get_width():
+            self.records_canvas = self.build_records_canvas(surface.get_width())
+            self.records_revision = self.leaderboard.revision
+        
+        view = self.get_records_view(surface)
+        self.max_scroll = max(0, self.records_canvas.get_height() - view.height)
+        self.scroll_offset = min(self.scroll_offset, self.max_scroll)
+        visible = pygame.Rect(0, int(self.scroll_offset), view.width, view.height)
+        surface.blit(self.records_canvas, view.topleft, visible)
+        self.mark_dirty(view)
+        self.records_changed = False
+        
         self.draw_hold_indicator(surface)
     
     def get_form_color(self, score):
@@ -1,9 +1,30 @@
+import argparse
 import json
 from app import KinectApp
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Kinect Fitness Playground")
+    parser.add_argument("--record", metavar="DIR", help="record sensor frames to DIR while running")
+    parser.add_argument("--no-record-color", action="store_true", help="only record body frames")
+    parser.add_argument("--replay", metavar="DIR", help="play back a recording instead of using the Kinect")
+    parser.add_argument("--fast", action="store_true", help="replay as fast as possible instead of in real time")
+    parser.add_argument("--loop", action="store_true", help="restart the replay when it reaches the end")
+    parser.add_argument("--headless", action="store_true", help="run without a window (SDL dummy video driver)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     with open("config.json", "r") as f:
         config = json.load(f)
+    if args.headless:
+        config.setdefault("window", {})["headless"] = True
+
+    kinect_manager = None
+    if args.replay:
+        from replay import ReplayKinectManager
+        kinect_manager = ReplayKinectManager(args.replay, config, realtime=not args.fast, loop=args.loop)
 
-    app = KinectApp(config)
+    app = KinectApp(config, kinect_manager)
+    if args.record:
+        app.kinect_manager.start_recording(args.record, include_color=not args.no_record_color)
     app.run()
@@ -0,0 +1,328 @@
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from kinect_compat import PyKinectV2
+from kinect_manager import KinectManager
+from joint_array import BodyArrays
+
+# On-disk layout of a recording directory:
+#   meta.json                 sizes, frame counts and format version
+#   body_timestamps.npy       float64 (frames,) seconds since the first frame
+#   body_joints.npy           float32 (frames, bodies, joints, 4) x, y, z, tracking state
+#   body_color_points.npy     float32 (frames, bodies, joints, 2) color camera pixels, inf if unmapped
+#   body_tracked.npy          bool    (frames, bodies)
+#   body_tracking_ids.npy     uint64  (frames, bodies)
+#   color_timestamps.npy      float64 (frames,)
+#   color_00000.npy, ...      uint8   (<=chunk, height, width, 4) BGRA, memory-mapped on load
+RECORDING_VERSION = 1
+COLOR_CHUNK_SIZE = 64
+
+FrameDescription = namedtuple("FrameDescription", ["Width", "Height"])
+ColorSpacePoint = namedtuple("ColorSpacePoint", ["x", "y"])
+
+class KinectRecorder:
+    """Streams captured frames into a recording directory."""
+
+    def __init__(self, path, max_body_count, include_color=True, chunk_size=COLOR_CHUNK_SIZE):
+        self.path = path
+        self.max_body_count = max_body_count
+        self.include_color = include_color
+        self.chunk_size = chunk_size
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        self._start_time = None
+        self._body_timestamps = []
+        self._body_joints = []
+        self._body_color_points = []
+        self._body_tracked = []
+        self._body_tracking_ids = []
+
+        self._color_timestamps = []
+        self._color_size = None
+        self._chunk = None
+        self._chunk_index = 0
+        self._chunk_fill = 0
+
+    def _relative_time(self, timestamp):
+        if self._start_time is None:
+            self._start_time = timestamp
+        return timestamp - self._start_time
+
+    def add_body_frame(self, timestamp, bodies, color_points):
+        """Store one BodyArrays frame with its (bodies, joints, 2) color camera projection."""
+        self._body_timestamps.append(self._relative_time(timestamp))
+        self._body_joints.append(bodies.joints)
+        self._body_color_points.append(color_points)
+        self._body_tracked.append(bodies.tracked)
+        self._body_tracking_ids.append(bodies.tracking_ids)
+
+    def add_color_frame(self, timestamp, frame):
+        if not self.include_color:
+            return
+        height, width = frame.shape[:2]
+        if self._color_size is None:
+            self._color_size = (width, height)
+        if self._chunk is None:
+            self._chunk = np.lib.format.open_memmap(
+                self._chunk_path(self._chunk_index), mode="w+", dtype=np.uint8,
+                shape=(self.chunk_size, height, width, 4))
+        self._chunk[self._chunk_fill] = frame
+        self._chunk_fill += 1
+        self._color_timestamps.append(self._relative_time(timestamp))
+        if self._chunk_fill == self.chunk_size:
+            self._finish_chunk()
+
+    def _chunk_path(self, index):
+        return os.path.join(self.path, "color_{:05d}.npy".format(index))
+
+    def _finish_chunk(self):
+        if self._chunk is None:
+            return
+        if self._chunk_fill < self.chunk_size:
+            # Trim the last, partially filled chunk
+            frames = np.array(self._chunk[:self._chunk_fill])
+            del self._chunk
+            np.save(self._chunk_path(self._chunk_index), frames)
+        else:
+            self._chunk.flush()
+            del self._chunk
+        self._chunk = None
+        self._chunk_index += 1
+        self._chunk_fill = 0
+
+    def close(self):
+        self._finish_chunk()
+        joint_count = PyKinectV2.JointType_Count
+
+        def save(name, frames, dtype, frame_shape):
+            array = np.array(frames, dtype=dtype) if frames else np.zeros((0,) + frame_shape, dtype=dtype)
+            np.save(os.path.join(self.path, name), array)
+
+        save("body_timestamps.npy", self._body_timestamps, np.float64, ())
+        save("body_joints.npy", self._body_joints, np.float32, (self.max_body_count, joint_count, 4))
+        save("body_color_points.npy", self._body_color_points, np.float32, (self.max_body_count, joint_count, 2))
+        save("body_tracked.npy", self._body_tracked, bool, (self.max_body_count,))
+        save("body_tracking_ids.npy", self._body_tracking_ids, np.uint64, (self.max_body_count,))
+        save("color_timestamps.npy", self._color_timestamps, np.float64, ())
+
+        color_width, color_height = self._color_size or (0, 0)
+        meta = {
+            "version": RECORDING_VERSION,
+            "max_body_count": self.max_body_count,
+            "joint_count": joint_count,
+            "body_frames": len(self._body_timestamps),
+            "color_frames": len(self._color_timestamps),
+            "color_width": color_width,
+            "color_height": color_height,
+            "color_chunk_size": self.chunk_size,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+class KinectRecording:
+    """Body and color frames of a recording, held in memory or memory-mapped from disk."""
+
+    def __init__(self, body_timestamps, body_joints, body_color_points, body_tracked, body_tracking_ids,
+                 color_timestamps=None, color_chunks=None, color_chunk_size=COLOR_CHUNK_SIZE, color_size=None):
+        self.body_timestamps = np.asarray(body_timestamps, dtype=np.float64)
+        self.body_joints = body_joints
+        self.body_color_points = body_color_points
+        self.body_tracked = body_tracked
+        self.body_tracking_ids = body_tracking_ids
+        self.max_body_count = body_tracked.shape[1]
+
+        if color_timestamps is None:
+            color_timestamps = []
+        self.color_timestamps = np.asarray(color_timestamps, dtype=np.float64)
+        self.color_chunks = color_chunks or []
+        self.color_chunk_size = color_chunk_size
+        if color_size is None:
+            color_size = (0, 0)
+            if self.color_chunks:
+                color_size = (self.color_chunks[0].shape[2], self.color_chunks[0].shape[1])
+        self.color_size = color_size
+
+        last_times = [times[-1] for times in (self.body_timestamps, self.color_timestamps) if len(times)]
+        self.duration = max(last_times) if last_times else 0.0
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != RECORDING_VERSION:
+            raise ValueError("Unsupported recording version: {}".format(meta.get("version")))
+
+        def load_array(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        chunk_size = meta["color_chunk_size"]
+        chunk_count = (meta["color_frames"] + chunk_size - 1) // chunk_size
+        color_chunks = [load_array("color_{:05d}.npy".format(i)) for i in range(chunk_count)]
+        return cls(
+            load_array("body_timestamps.npy"),
+            load_array("body_joints.npy"),
+            load_array("body_color_points.npy"),
+            load_array("body_tracked.npy"),
+            load_array("body_tracking_ids.npy"),
+            color_timestamps=load_array("color_timestamps.npy"),
+            color_chunks=color_chunks,
+            color_chunk_size=chunk_size,
+            color_size=(meta["color_width"], meta["color_height"]),
+        )
+
+    def color_frame(self, index):
+        return self.color_chunks[index // self.color_chunk_size][index % self.color_chunk_size]
+
+class ReplayJoints:
+    """Opaque joints handle of one replayed body, resolved by ReplayRuntime's coordinate mapper."""
+
+    def __init__(self, color_points):
+        self.color_points = color_points
+
+class ReplayBody:
+    def __init__(self, is_tracked, tracking_id, color_points):
+        self.is_tracked = is_tracked
+        self.tracking_id = tracking_id
+        self.joints = ReplayJoints(color_points)
+
+class ReplayBodyFrame:
+    """Stand-in for PyKinect2's body frame data built from a recorded frame.
+
+    body_arrays carries the recorded joint arrays, so KinectManager does not
+    have to rebuild them.
+    """
+
+    def __init__(self, recording, index):
+        self.relative_time = recording.body_timestamps[index]
+        joints = np.array(recording.body_joints[index])
+        joints.flags.writeable = False
+        tracked = np.array(recording.body_tracked[index])
+        tracking_ids = np.array(recording.body_tracking_ids[index])
+        self.bodies = [
+            ReplayBody(bool(tracked[i]), int(tracking_ids[i]), recording.body_color_points[index, i])
+            for i in range(recording.max_body_count)
+        ]
+        self.body_arrays = BodyArrays(joints, tracked, tracking_ids, self)
+
+class ReplayRuntime:
+    """Plays a KinectRecording through the subset of PyKinectRuntime that KinectManager uses.
+
+    In real-time mode frames become available as their recorded timestamps
+    pass. Otherwise a virtual clock only moves when advance() is called, which
+    steps to the next recorded frame so playback runs as fast as the caller can
+    consume it.
+    """
+
+    def __init__(self, recording, realtime=True, loop=False):
+        self.recording = recording
+        self.realtime = realtime
+        self.loop = loop
+        self.max_body_count = recording.max_body_count
+        self.color_frame_desc = FrameDescription(*recording.color_size)
+        self._start_time = None
+        self._virtual_time = -1.0
+        self._color_index = -1
+        self._body_index = -1
+
+    def _rewind(self):
+        self._start_time = time.monotonic()
+        self._virtual_time = -1.0
+        self._color_index = -1
+        self._body_index = -1
+
+    def _now(self):
+        if not self.realtime:
+            return self._virtual_time
+        if self._start_time is None:
+            self._start_time = time.monotonic()
+        elapsed = time.monotonic() - self._start_time
+        if self.loop and elapsed > self.recording.duration and self.finished_frames():
+            self._rewind()
+            elapsed = 0.0
+        return elapsed
+
+    def _due_index(self, timestamps):
+        return int(np.searchsorted(timestamps, self._now(), side="right")) - 1
+
+    def finished_frames(self):
+        return (self._body_index >= len(self.recording.body_timestamps) - 1 and
+                self._color_index >= len(self.recording.color_timestamps) - 1)
+
+    @property
+    def finished(self):
+        return not self.loop and self.finished_frames()
+
+    def advance(self):
+        """Move the virtual clock to the next recorded frame. Returns False at the end of the recording."""
+        upcoming = []
+        if self._body_index + 1 < len(self.recording.body_timestamps):
+            upcoming.append(self.recording.body_timestamps[self._body_index + 1])
+        if self._color_index + 1 < len(self.recording.color_timestamps):
+            upcoming.append(self.recording.color_timestamps[self._color_index + 1])
+        if not upcoming:
+            if not self.loop or self.recording.duration <= 0:
+                return False
+            self._rewind()
+            return self.advance()
+        self._virtual_time = min(upcoming)
+        return True
+
+    def has_new_color_frame(self):
+        return len(self.recording.color_timestamps) > 0 and \
+            self._due_index(self.recording.color_timestamps) > self._color_index
+
+    def get_last_color_frame(self):
+        index = self._due_index(self.recording.color_timestamps)
+        if index < 0:
+            return None
+        self._color_index = index
+        # Copy out of the memory map, like PyKinectRuntime hands out a copy
+        return np.array(self.recording.color_frame(index)).ravel()
+
+    def has_new_body_frame(self):
+        return len(self.recording.body_timestamps) > 0 and \
+            self._due_index(self.recording.body_timestamps) > self._body_index
+
+    def get_last_body_frame(self):
+        index = self._due_index(self.recording.body_timestamps)
+        if index < 0:
+            return None
+        self._body_index = index
+        return ReplayBodyFrame(self.recording, index)
+
+    def body_joints_to_color_space(self, joints):
+        return [ColorSpacePoint(float(x), float(y)) for x, y in joints.color_points]
+
+    def close(self):
+        pass
+
+class ReplayKinectManager(KinectManager):
+    """KinectManager that plays back a recording instead of talking to the sensor.
+
+    realtime=False disables the capture thread and advances one recorded frame
+    per poll(), for reproducible as-fast-as-possible benchmark runs.
+    """
+
+    def __init__(self, recording, config=None, realtime=True, loop=False):
+        if not isinstance(recording, KinectRecording):
+            recording = KinectRecording.load(recording)
+        if config is None:
+            config = {}
+        capture_cfg = dict(config.get("capture", {}))
+        capture_cfg["threaded"] = realtime and capture_cfg.get("threaded", True)
+        config = dict(config, capture=capture_cfg)
+        super().__init__(config, runtime=ReplayRuntime(recording, realtime=realtime, loop=loop))
+
+    @property
+    def finished(self):
+        return self.kinect.finished
+
+    def poll(self):
+        if not self.kinect.realtime:
+            self.kinect.advance()
+        return super().poll()
@@ -1,6 +1,8 @@
 import pygame
-import math
-from pykinect2 import PyKinectV2
+import time
+import numpy as np
+from kinect_compat import PyKinectV2
+from joint_array import STATE
 
 BONES = [
     (PyKinectV2.JointType_Head, PyKinectV2.JointType_Neck),
@@ -25,7 +27,34 @@ BONES = [
     (PyKinectV2.JointType_AnkleLeft, PyKinectV2.JointType_FootLeft),
 ]
 
+# BONES as five polylines from the torso outwards, so each limb is one
+# pygame.draw.lines call. Together they cover every bone exactly once.
+BONE_CHAINS = [
+    np.array([PyKinectV2.JointType_Head, PyKinectV2.JointType_Neck, PyKinectV2.JointType_SpineShoulder,
+              PyKinectV2.JointType_SpineMid, PyKinectV2.JointType_SpineBase]),
+    np.array([PyKinectV2.JointType_SpineShoulder, PyKinectV2.JointType_ShoulderRight, PyKinectV2.JointType_ElbowRight,
+              PyKinectV2.JointType_WristRight, PyKinectV2.JointType_HandRight]),
+    np.array([PyKinectV2.JointType_SpineShoulder, PyKinectV2.JointType_ShoulderLeft, PyKinectV2.JointType_ElbowLeft,
+              PyKinectV2.JointType_WristLeft, PyKinectV2.JointType_HandLeft]),
+    np.array([PyKinectV2.JointType_SpineBase, PyKinectV2.JointType_HipRight, PyKinectV2.JointType_KneeRight,
+              PyKinectV2.JointType_AnkleRight, PyKinectV2.JointType_FootRight]),
+    np.array([PyKinectV2.JointType_SpineBase, PyKinectV2.JointType_HipLeft, PyKinectV2.JointType_KneeLeft,
+              PyKinectV2.JointType_AnkleLeft, PyKinectV2.JointType_FootLeft]),
+]
+
+# Body frames further apart than this are not blended (person re-acquired, sensor stall)
+MAX_MOTION_INTERVAL = 0.2
+
 class SkeletonRenderer:
+    """Draws tracked skeletons over the color feed.
+
+    Body frames arrive at 30 Hz while the display may run faster, so joint
+    positions are blended between the last two body frames of each person:
+    "interpolate" draws one body frame behind and moves smoothly between
+    samples, "extrapolate" continues the last motion up to max_extrapolation
+    body frame intervals ahead, "none" draws the latest frame as is.
+    """
+
     def __init__(self, kinect_manager, config=None):
         self.kinect_manager = kinect_manager
         if config is None:
@@ -36,33 +65,103 @@ class SkeletonRenderer:
         self.joint_color = tuple(colors_cfg.get("skeleton_joints", [255, 0, 0]))
         self.bone_thickness = skeleton_cfg.get("bone_thickness", 4)
         self.joint_radius = skeleton_cfg.get("joint_radius", 5)
+        self.motion = skeleton_cfg.get("motion", "interpolate")
+        self.max_extrapolation = skeleton_cfg.get("max_extrapolation", 1.0)
+
+        radius = self.joint_radius
+        self.joint_sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(self.joint_sprite, self.joint_color, (radius, radius), radius)
+
+        # tracking id -> (previous, latest) as (body_seq, timestamp, points) per person
+        self._history = {}
+
+    def visible_joints(self, joints, joint_points):
+        """Mask of joints that are tracked (or inferred) and have a finite color-space position."""
+        return (joints[:, STATE] != PyKinectV2.TrackingState_NotTracked) & np.isfinite(joint_points).all(axis=1)
+
+    def reset(self):
+        self._history = {}
+
+    def _remember(self, tracking_id, body_seq, timestamp, points):
+        history = self._history.get(tracking_id)
+        if history is not None and history[1][0] == body_seq:
+            return history
+        latest = (body_seq, timestamp, points)
+        history = (history[1] if history is not None else latest, latest)
+        self._history[tracking_id] = history
+        return history
+
+    def _blend(self, history, now):
+        (_, t0, p0), (_, t1, p1) = history
+        interval = t1 - t0
+        if self.motion == "none" or interval <= 0 or interval > MAX_MOTION_INTERVAL or now is None:
+            return p1
+        if self.motion == "extrapolate":
+            alpha = 1.0 + min(max((now - t1) / interval, 0.0), self.max_extrapolation)
+        else:
+            alpha = min(max((now - interval - t0) / interval, 0.0), 1.0)
+        blended = p0 + (p1 - p0) * alpha
+        # Joints missing from the previous frame are drawn where they are now
+        return np.where(np.isnan(blended), p1, blended)
+
+    def is_animating(self, now=None):
+        """True while a blended skeleton has not yet reached where motion blending stops."""
+        if self.motion == "none":
+            return False
+        if now is None:
+            now = time.monotonic()
+        steps = self.max_extrapolation if self.motion == "extrapolate" else 1.0
+        for (_, t0, _), (_, t1, _) in self._history.values():
+            interval = t1 - t0
+            if 0 < interval <= MAX_MOTION_INTERVAL and now < t1 + interval * steps:
+                return True
+        return False
+
+    def draw_points(self, surface, joint_points, visible):
+        """Draw one skeleton from (JointType_Count, 2) pixel positions. Returns the drawn Rects."""
+        pixels = np.where(visible[:, None], joint_points, 0).astype(np.int32)
+        drawn = []
+        for chain in BONE_CHAINS:
+            chain_visible = visible[chain]
+            if chain_visible.all():
+                runs = [chain]
+            else:
+                runs = [chain[run[chain_visible[run]]]
+                        for run in np.split(np.arange(len(chain)), np.flatnonzero(~chain_visible))]
+            for run in runs:
+                if len(run) >= 2:
+                    drawn.append(pygame.draw.lines(surface, self.bone_color, False, pixels[run].tolist(), self.bone_thickness))
+
+        offset = pixels[visible] - self.joint_radius
+        drawn.extend(surface.blits([(self.joint_sprite, point) for point in offset.tolist()]))
+        return drawn
 
-    def is_valid_point(self, point):
-        return not math.isinf(point.x) and not math.isinf(point.y)
+    def draw(self, bodies, surface, now=None):
+        """Draw every tracked skeleton and return the bounding Rect of what was drawn, or None.
 
-    def draw(self, bodies, surface):
+        now is the time.monotonic() the frame will be shown at; it defaults to
+        the current time.
+        """
         if bodies is None:
-            return
-        for i in range(self.kinect_manager.kinect.max_body_count):
-            body = bodies.bodies[i]
-            if not body.is_tracked:
-                continue
-            joints = body.joints
-            joint_points = self.kinect_manager.kinect.body_joints_to_color_space(joints)
-            for bone in BONES:
-                start_joint, end_joint = bone
-                if joints[start_joint].TrackingState == PyKinectV2.TrackingState_NotTracked or \
-                   joints[end_joint].TrackingState == PyKinectV2.TrackingState_NotTracked:
-                    continue
-                start = joint_points[start_joint]
-                end = joint_points[end_joint]
-                if self.is_valid_point(start) and self.is_valid_point(end):
-                    pygame.draw.line(surface, self.bone_color,
-                                     (int(start.x), int(start.y)), (int(end.x), int(end.y)), 
-                                     self.bone_thickness)
-            for joint_id in range(PyKinectV2.JointType_Count):
-                joint = joints[joint_id]
-                point = joint_points[joint_id]
-                if joint.TrackingState != PyKinectV2.TrackingState_NotTracked and self.is_valid_point(point):
-                    pygame.draw.circle(surface, self.joint_color, 
-                                       (int(point.x), int(point.y)), self.joint_radius)
+            self.reset()
+            return None
+        if now is None:
+            now = time.monotonic()
+        snapshot = self.kinect_manager.get_snapshot()
+        drawn = []
+        tracked_ids = set()
+        for i in np.flatnonzero(bodies.tracked):
+            tracking_id = bodies.tracking_ids[i]
+            tracked_ids.add(tracking_id)
+            joint_points = self.kinect_manager.body_screen_points(bodies, i)
+            if snapshot.bodies is bodies and snapshot.body_timestamp is not None:
+                history = self._remember(tracking_id, snapshot.body_seq, snapshot.body_timestamp, joint_points)
+                joint_points = self._blend(history, now)
+            visible = self.visible_joints(bodies.joints[i], joint_points)
+            drawn.extend(self.draw_points(surface, joint_points, visible))
+        for tracking_id in list(self._history):
+            if tracking_id not in tracked_ids:
+                del self._history[tracking_id]
+        if not drawn:
+            return None
+        return drawn[0].unionall(drawn[1:])
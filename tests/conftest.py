@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Run pygame without a window and import the flat top-level modules
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kinect_compat import PyKinectV2
+from replay import KinectRecording
+
+def make_recording(joint_pixels=None, frames=1, max_body_count=6):
+    """Recording with body slot 0 tracked and the given {joint type: (x, y)} native color pixels."""
+    joint_count = PyKinectV2.JointType_Count
+    joints = np.zeros((frames, max_body_count, joint_count, 4), dtype=np.float32)
+    color_points = np.full((frames, max_body_count, joint_count, 2), np.inf, dtype=np.float32)
+    tracked = np.zeros((frames, max_body_count), dtype=bool)
+    tracking_ids = np.zeros((frames, max_body_count), dtype=np.uint64)
+    tracked[:, 0] = True
+    tracking_ids[:, 0] = 1
+    for joint, point in (joint_pixels or {}).items():
+        joints[:, 0, joint, 3] = PyKinectV2.TrackingState_Tracked
+        color_points[:, 0, joint] = point
+    return KinectRecording(np.arange(frames) / 30.0, joints, color_points, tracked, tracking_ids,
+                           color_size=(1920, 1080))
+
+@pytest.fixture
+def config():
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")) as f:
+        config = json.load(f)
+    config.setdefault("window", {})["headless"] = True
+    config.setdefault("capture", {})["threaded"] = False
+    config.setdefault("menus", {})["preload"] = False
+    return config
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+
+from heartrate.detector_worker import HeartRateWorker
+
+FRAME = np.full((54, 96, 4), 60, dtype=np.uint8)
+
+def wait_for_status(worker, predicate, timeout=10.0):
+    """Send frames and poll until the current measurement reports a status matching predicate."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        worker.process_frame(FRAME, time.time())
+        status = worker.get_status_info()
+        if status is not None and predicate(status):
+            return status
+        time.sleep(0.02)
+    raise AssertionError("no matching status from the worker")
+
+def make_worker(config):
+    config["heart_rate"]["countdown_time"] = 0
+    return HeartRateWorker(config, status_interval=0.02)
+
+def test_reset_ignores_statuses_of_the_previous_measurement(config):
+    worker = make_worker(config)
+    try:
+        wait_for_status(worker, lambda status: status['is_recording'])
+        worker.reset()
+        assert worker.get_status_info() is None
+        assert worker.frames_sent == 0
+        # The first status of the new measurement comes from its reset: no samples yet
+        status = wait_for_status(worker, lambda status: True)
+        assert status['samples_collected'] <= 1
+        assert 'frames_dropped' in status
+    finally:
+        worker.close()
+
+def test_pause_stops_status_messages(config):
+    worker = make_worker(config)
+    try:
+        wait_for_status(worker, lambda status: status['is_recording'])
+        worker.pause()
+        time.sleep(0.3)
+        worker.poll()
+        # Whatever was queued before the pause is drained; nothing new arrives
+        time.sleep(0.3)
+        assert worker.statuses.empty()
+        assert worker.get_status_info() is None
+    finally:
+        worker.close()
+
+def test_close_stops_the_process(config):
+    worker = make_worker(config)
+    wait_for_status(worker, lambda status: True)
+    process = worker.process
+    worker.close()
+    assert worker.process is None
+    assert not process.is_alive()
+    assert process.exitcode == 0
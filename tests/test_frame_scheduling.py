@@ -0,0 +1,38 @@
+from conftest import make_recording
+from replay import ReplayKinectManager
+
+def make_app(config):
+    from app import KinectApp
+    config["timing"]["render_mode"] = "on_demand"
+    config["visual_effects"]["camera_background"] = False
+    kinect_manager = ReplayKinectManager(make_recording(frames=30), config, realtime=False, loop=True)
+    return KinectApp(config, kinect_manager)
+
+def run_frame(app, menu):
+    snapshot = app.kinect_manager.poll()
+    if app.scheduler.should_update(menu, snapshot):
+        menu.update(app.screen)
+    drawn = app.scheduler.should_draw(menu, snapshot)
+    if drawn:
+        menu.draw_layered(app.screen)
+    return drawn
+
+def test_hold_indicator_is_erased_when_hover_ends(config):
+    app = make_app(config)
+    try:
+        menu = app.get_menu("main")
+        app.switch_to_menu("main")
+        button = menu.buttons[0]
+        menu.get_hand_position = lambda: (float(button.rect.centerx), float(button.rect.centery))
+        run_frame(app, menu)
+        assert menu.holding_button == button.action
+        assert run_frame(app, menu)
+
+        menu.get_hand_position = lambda: None
+        # One more draw removes the "Holding" text, then the menu goes idle
+        assert run_frame(app, menu)
+        assert menu.holding_button is None
+        assert not run_frame(app, menu)
+        assert not run_frame(app, menu)
+    finally:
+        app.close()
@@ -0,0 +1,36 @@
+import numpy as np
+
+from heartrate.heart_rate_detector import HeartRateDetector
+
+class BrightSquareCascade:
+    """Stands in for the Haar cascade: the bounding box of all bright pixels is the face."""
+
+    def detectMultiScale(self, gray_frame, **kwargs):
+        ys, xs = np.nonzero(gray_frame > 200)
+        if len(xs) == 0:
+            return []
+        return [(xs.min(), ys.min(), xs.max() - xs.min() + 1, ys.max() - ys.min() + 1)]
+
+def make_detector(config):
+    detector = HeartRateDetector(config)
+    detector.face_cascade = BrightSquareCascade()
+    detector.reset()
+    return detector
+
+def make_frame():
+    frame = np.full((1080, 1920, 4), 60, dtype=np.uint8)
+    frame[300:540, 900:1140] = 230
+    return frame
+
+def test_forehead_roi_from_head_and_neck(config):
+    detector = make_detector(config)
+    roi = detector.detect_forehead_roi(make_frame(), ((1000.0, 450.0), (1000.0, 650.0)))
+    assert detector.detection_mode == "skeleton"
+    assert roi == (950, 380, 100, 40)
+
+def test_tiny_joint_box_falls_back_to_cascade(config):
+    detector = make_detector(config)
+    # Neck inferred almost on top of the Head: the joint box is below min_face_size
+    roi = detector.detect_forehead_roi(make_frame(), ((1000.0, 450.0), (1000.0, 455.0)))
+    assert detector.detection_mode == "full"
+    assert roi == (960, 336, 120, 48)
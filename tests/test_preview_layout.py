@@ -0,0 +1,35 @@
+from conftest import make_recording
+from kinect_compat import PyKinectV2
+from replay import ReplayKinectManager
+
+def make_app(config, recording):
+    from app import KinectApp
+    config["capture"].update(preview_width=960, preview_height=540)
+    kinect_manager = ReplayKinectManager(recording, config, realtime=False)
+    return KinectApp(config, kinect_manager)
+
+def test_main_menu_buttons_inside_screen_with_smaller_preview(config):
+    app = make_app(config, make_recording())
+    try:
+        menu = app.get_menu("main")
+        screen_rect = app.screen.get_rect()
+        assert screen_rect.size == (config["window"]["width"], config["window"]["height"])
+        assert menu.buttons
+        for button in menu.buttons:
+            assert screen_rect.contains(button.rect), button.action
+    finally:
+        app.close()
+
+def test_hand_position_is_scaled_to_window_space(config):
+    recording = make_recording({PyKinectV2.JointType_HandRight: (960.0, 540.0)})
+    app = make_app(config, recording)
+    try:
+        app.kinect_manager.poll()
+        hand_x, hand_y = app.get_menu("main").get_hand_position()
+        # Native camera pixels -> 960x540 preview -> 1920x1080 window
+        assert (round(hand_x), round(hand_y)) == (960, 540)
+        bodies = app.kinect_manager.get_bodies()
+        preview_x, preview_y = app.kinect_manager.body_color_points(bodies, 0)[PyKinectV2.JointType_HandRight]
+        assert (round(preview_x), round(preview_y)) == (480, 270)
+    finally:
+        app.close()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from heartrate.live_estimator import LiveHeartRateEstimator
+from heartrate.rppg import RPPG_METHODS, normalize_channels, pos_pulse
+
+FS = 30.0
+
+def make_trace(seconds=20, pulse_hz=1.2):
+    """R, G, B means of a forehead with a 1.2 Hz (72 BPM) pulse, strongest in green."""
+    t = np.arange(int(seconds * FS)) / FS
+    pulse = np.sin(2 * np.pi * pulse_hz * t)
+    return np.array([150 + 0.3 * pulse, 110 + 0.6 * pulse, 90 + 0.2 * pulse])
+
+@pytest.mark.parametrize("method", RPPG_METHODS)
+def test_each_method_recovers_the_pulse(method):
+    bpm, snr = LiveHeartRateEstimator().estimate_rgb(make_trace(), FS, method)
+    assert bpm == pytest.approx(72, abs=1)
+    assert snr > 0
+
+def test_pos_pulse_covers_the_whole_trace():
+    rgb = make_trace(seconds=5)
+    assert pos_pulse(rgb, int(1.6 * FS)).shape == (rgb.shape[1],)
+
+def test_dark_trace_gives_no_pulse():
+    rgb = np.zeros((3, 100))
+    assert normalize_channels(rgb) is None
+    assert pos_pulse(rgb, 48) is None
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        LiveHeartRateEstimator().estimate_rgb(make_trace(), FS, "red")
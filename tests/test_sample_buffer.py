@@ -0,0 +1,32 @@
+import numpy as np
+
+from heartrate.sample_buffer import SampleRingBuffer
+
+def fill(buffer, values):
+    for value in values:
+        buffer.append((value, -value))
+
+def test_wraps_around_keeping_the_newest_samples_in_order():
+    buffer = SampleRingBuffer(2, 5)
+    fill(buffer, range(12))
+    assert len(buffer) == 5
+    np.testing.assert_array_equal(buffer.last(), [[7, 8, 9, 10, 11], [-7, -8, -9, -10, -11]])
+
+def test_last_n_is_a_read_only_view():
+    buffer = SampleRingBuffer(2, 5)
+    fill(buffer, range(7))
+    view = buffer.last(3)
+    np.testing.assert_array_equal(view[0], [4, 5, 6])
+    assert np.shares_memory(view, buffer._data)
+    assert not view.flags.writeable
+    # Asking for more than is stored returns what there is
+    np.testing.assert_array_equal(buffer.last(10)[0], [2, 3, 4, 5, 6])
+
+def test_clear_empties_the_buffer():
+    buffer = SampleRingBuffer(2, 5)
+    fill(buffer, range(3))
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.last().shape == (2, 0)
+    fill(buffer, [9])
+    np.testing.assert_array_equal(buffer.last(), [[9], [-9]])
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+DEFAULT_TEXT_CACHE_SIZE = 256
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Surfaces are shared between callers and must be treated as read-only
+    (blit them, do not draw on them).
+    """
+
+    def __init__(self, max_size=DEFAULT_TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        while len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def resize(self, max_size):
+        self.max_size = max_size
+        while len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._surfaces),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / float(total) if total else 0.0,
+        }
+
+# Shared by every menu, so labels survive menu switches
+text_cache = TextCache()